@@ -0,0 +1,46 @@
+import os
+import pygame
+
+# Asset paths are resolved relative to the game directory, not the cwd
+ASSET_DIR = os.path.dirname(os.path.abspath(__file__))
+
+class AssetManager:
+    """Loads image files once and serves cached, display-ready surfaces"""
+    
+    def __init__(self, base_dir=ASSET_DIR):
+        self.base_dir = base_dir
+        self.images = {}
+    
+    def get_image(self, path, max_width=None, alpha=False):
+        """Return the image at path, scaled down to max_width if wider.
+
+        The file is decoded, scaled and converted on first use only. Images
+        that fail to load are cached as None so a missing file is not
+        retried every frame.
+        """
+        key = (path, max_width, alpha)
+        if key not in self.images:
+            self.images[key] = self._load_image(path, max_width, alpha)
+        return self.images[key]
+    
+    def _load_image(self, path, max_width, alpha):
+        """Load, scale and convert an image"""
+        try:
+            image = pygame.image.load(os.path.join(self.base_dir, path))
+        except (pygame.error, FileNotFoundError):
+            return None
+        
+        img_width, img_height = image.get_size()
+        if max_width is not None and img_width > max_width:
+            scale_factor = max_width / img_width
+            new_size = (int(img_width * scale_factor), int(img_height * scale_factor))
+            image = pygame.transform.scale(image, new_size)
+        
+        # Match the display pixel format so blits need no conversion
+        if pygame.display.get_surface() is not None:
+            image = image.convert_alpha() if alpha else image.convert()
+        return image
+    
+    def clear(self):
+        """Drop all cached images"""
+        self.images.clear()
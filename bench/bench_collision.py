@@ -0,0 +1,83 @@
+#!/usr/bin/env python3
+"""Platform collision benchmark: full group scan vs PlatformGrid.
+
+Runs every level with a crowd of extra enemies and reports how many
+platform rects the entities test per frame and the Game.update time,
+first with each entity scanning the whole platform group (the old
+behaviour) and then with the column grid built in Game.load_level. The
+two are timed alternately --repeats times and the fastest mean of each is
+reported, so background load on the machine does not decide the result.
+"""
+
+import argparse
+
+from _common import make_game, time_frames
+
+from game_objects import PlatformGrid
+
+
+class FullScan:
+    """Collision index that returns every platform, like the raw group did"""
+
+    def __init__(self, platforms):
+        self.platforms = list(platforms)
+
+    def query(self, rect):
+        return self.platforms
+
+
+class CountingIndex:
+    """Wraps a collision index and counts the candidates it hands out"""
+
+    def __init__(self, index):
+        self.index = index
+        self.checks = 0
+
+    def query(self, rect):
+        candidates = self.index.query(rect)
+        self.checks += len(candidates)
+        return candidates
+
+
+INDEXES = (('scan', FullScan), ('grid', PlatformGrid))
+
+
+def run_level(level_num, extra_enemies, frames, repeats):
+    checks = {}
+    for label, make_index in INDEXES:
+        game = make_game(level_num, extra_enemies, headless=True)
+        counter = CountingIndex(make_index(game.platforms))
+        game.platform_grid = counter
+        for _ in range(frames):
+            game.update()
+        checks[label] = counter.checks / frames
+
+    times = {label: [] for label, _ in INDEXES}
+    for _ in range(repeats):
+        for label, make_index in INDEXES:
+            game = make_game(level_num, extra_enemies, headless=True)
+            game.platform_grid = make_index(game.platforms)
+            times[label].append(time_frames(game.update, frames))
+    return {label: (checks[label], min(times[label])) for label, _ in INDEXES}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--enemies', type=int, default=300, help='extra enemies per level')
+    parser.add_argument('--frames', type=int, default=300, help='frames to simulate per run')
+    parser.add_argument('--repeats', type=int, default=5, help='timed runs per index')
+    args = parser.parse_args()
+
+    print(f"{'level':>5} {'platforms':>9} {'scan checks':>12} {'grid checks':>12} "
+          f"{'scan ms':>8} {'grid ms':>8}")
+    for level_num in range(1, 6):
+        platforms = len(make_game(level_num, headless=True).platforms)
+        results = run_level(level_num, args.enemies, args.frames, args.repeats)
+        scan_checks, scan_ms = results['scan']
+        grid_checks, grid_ms = results['grid']
+        print(f"{level_num:>5} {platforms:>9} {scan_checks:>12.0f} {grid_checks:>12.0f} "
+              f"{scan_ms:>8.2f} {grid_ms:>8.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,29 @@
+#!/usr/bin/env python3
+"""Entity backend benchmark: per-sprite updates vs the NumPy batch.
+
+Reports the mean Game.update time with increasingly large enemy crowds for
+the default sprite backend and for entity_backend='numpy'.
+"""
+
+import argparse
+
+from _common import make_game, time_frames
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--level', type=int, default=5, help='level to run')
+    parser.add_argument('--frames', type=int, default=200, help='frames to simulate per run')
+    args = parser.parse_args()
+
+    print(f"{'enemies':>7} {'sprites ms':>10} {'numpy ms':>9}")
+    for extra in (0, 100, 300, 1000):
+        times = []
+        for backend in ('sprites', 'numpy'):
+            game = make_game(args.level, extra, headless=True, entity_backend=backend)
+            times.append(time_frames(game.update, args.frames))
+        print(f"{len(game.enemies):>7} {times[0]:>10.2f} {times[1]:>9.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""Level load-time benchmark: synchronous load, background build + commit, respawn.
+
+For every level reports the mean time of a first Game.load_level (build and
+commit on the main thread), of the build step alone (what the background
+thread does while the level-complete screen is up), of the main-thread
+commit when the build was prefetched, and of a respawn, which restores the
+compiled level instead of building it. A last row repeats this for a
+generated level with --tiles platform tiles (see bench_level_memory).
+"""
+
+import argparse
+import contextlib
+import io
+import time
+
+from _common import make_game
+
+import level_loader
+from bench_level_memory import generate_level
+from level_loader import build_level
+
+
+def mean_ms(action, runs):
+    """Mean milliseconds per call of action(), with the game's chatter muted"""
+    total = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(runs):
+            start = time.perf_counter()
+            action()
+            total += time.perf_counter() - start
+    return total * 1000 / runs
+
+
+def measure_commit(game, level_num, runs):
+    """Mean load_level time when the level was already built in the background"""
+    total = 0
+    with contextlib.redirect_stdout(io.StringIO()):
+        for _ in range(runs):
+            game.level_loader.prefetch(level_num)
+            game.level_loader.pending[level_num].result()
+            game.compiled_levels.clear()
+            start = time.perf_counter()
+            game.load_level(level_num)
+            total += time.perf_counter() - start
+    return total * 1000 / runs
+
+
+def first_load(game, level_num):
+    """Load a level as if for the first time, with no compiled copy cached"""
+    game.compiled_levels.clear()
+    game.load_level(level_num)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=50, help='loads to average per level')
+    parser.add_argument('--tiles', type=int, default=10000, help='platform tiles in the generated level')
+    args = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = make_game(headless=True)
+
+    print(f"{'level':>9} {'sync ms':>8} {'build ms':>9} {'commit ms':>10} {'respawn ms':>11}")
+    for level_num in range(1, 6):
+        sync_ms = mean_ms(lambda: first_load(game, level_num), args.runs)
+        build_ms = mean_ms(lambda: build_level(level_num), args.runs)
+        commit_ms = measure_commit(game, level_num, args.runs)
+        respawn_ms = mean_ms(lambda: game.load_level(level_num), args.runs)
+        print(f"{level_num:>9} {sync_ms:>8.3f} {build_ms:>9.3f} {commit_ms:>10.3f} {respawn_ms:>11.3f}")
+
+    # Level 1 replaced by a large generated level
+    level = generate_level(args.tiles, args.tiles // 10, args.tiles // 20)
+    original = level_loader.create_level_platforms
+    level_loader.create_level_platforms = lambda level_num: level
+    try:
+        runs = max(1, args.runs // 10)
+        sync_ms = mean_ms(lambda: first_load(game, 1), runs)
+        build_ms = mean_ms(lambda: build_level(1), runs)
+        commit_ms = measure_commit(game, 1, runs)
+        respawn_ms = mean_ms(lambda: game.load_level(1), runs)
+        print(f"{f'{args.tiles} tiles':>9} {sync_ms:>8.3f} {build_ms:>9.3f} {commit_ms:>10.3f} "
+              f"{respawn_ms:>11.3f}")
+    finally:
+        level_loader.create_level_platforms = original
+    game.level_loader.shutdown()
+
+
+if __name__ == '__main__':
+    main()
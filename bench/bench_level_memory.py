@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""Level memory and load-time benchmark: slotted objects vs pygame sprites.
+
+Builds a generated level with 10,000 platform tiles (plus obstacles and
+power-ups) and measures Game.load_level time and the memory held by the
+level's static objects, first with the current slotted Platform, Obstacle
+and PowerUp classes kept in lists, then with sprite-based copies of the old
+classes kept in sprite groups.
+"""
+
+import argparse
+import gc
+import time
+import tracemalloc
+
+from _common import make_game
+
+import pygame
+
+import level_loader
+from game_objects import Obstacle, Platform, PowerUp
+
+
+class SpritePlatform(pygame.sprite.Sprite):
+    def __init__(self, x, y, width, height, platform_type='normal'):
+        super().__init__()
+        self.rect = pygame.Rect(x, y, width, height)
+        self.platform_type = platform_type
+
+
+class SpriteObstacle(pygame.sprite.Sprite):
+    # Level snapshots save these, as they save the slots of the real classes
+    STATE_ATTRIBUTES = Obstacle.__slots__
+
+    def __init__(self, x, y, width, height, obstacle_type='spike'):
+        super().__init__()
+        self.rect = pygame.Rect(x, y, width, height)
+        self.obstacle_type = obstacle_type
+        self.damage = 30 if obstacle_type == 'spike' else 20
+        self.timer = 0
+
+
+class SpritePowerUp(pygame.sprite.Sprite):
+    STATE_ATTRIBUTES = PowerUp.__slots__
+
+    def __init__(self, x, y, powerup_type):
+        super().__init__()
+        self.type = powerup_type
+        self.rect = pygame.Rect(x, y, 30, 30)
+        self.timer = 0
+        self.float_offset = 0
+        self.base_y = y
+
+
+def generate_level(tiles, obstacles, powerups):
+    """Return level data shaped like create_level_platforms output.
+
+    Tiles are laid out in rows with gaps between them so the ground merge in
+    the real generator would not collapse them.
+    """
+    per_row = 200
+    platform_data = [((i % per_row) * 50, 100 + (i // per_row) * 14, 40, 10, 'normal')
+                     for i in range(tiles)]
+    obstacle_types = ('spike', 'lava', 'saw')
+    obstacle_data = [((i * 53) % 10000, 820, 40, 30, obstacle_types[i % 3])
+                     for i in range(obstacles)]
+    powerup_types = ('speed', 'jump', 'invincible', 'magnet')
+    powerup_data = [((i * 71) % 10000, 300 + (i * 13) % 400, powerup_types[i % 4])
+                    for i in range(powerups)]
+    return platform_data, obstacle_data, [], powerup_data
+
+
+def measure_objects(level, classes, container):
+    """Memory in KiB held by the static objects of one level"""
+    platform_cls, obstacle_cls, powerup_cls = classes
+    platform_data, obstacle_data, _, powerup_data = level
+    gc.collect()
+    tracemalloc.start()
+    before = tracemalloc.get_traced_memory()[0]
+    held = (container(platform_cls(*data) for data in platform_data),
+            container(obstacle_cls(*data) for data in obstacle_data),
+            container(powerup_cls(*data) for data in powerup_data))
+    size = tracemalloc.get_traced_memory()[0] - before
+    tracemalloc.stop()
+    del held
+    return size / 1024
+
+
+def measure_load(game, level, classes, runs):
+    """Mean Game.load_level time in milliseconds for the generated level"""
+    originals = (level_loader.create_level_platforms, level_loader.Platform,
+                 level_loader.Obstacle, level_loader.PowerUp)
+    level_loader.create_level_platforms = lambda level_num: level
+    level_loader.Platform, level_loader.Obstacle, level_loader.PowerUp = classes
+    try:
+        game.compiled_levels.clear()
+        game.load_level(1)  # warm the sprite caches
+        start = time.perf_counter()
+        for _ in range(runs):
+            game.compiled_levels.clear()
+            game.load_level(1)
+        return (time.perf_counter() - start) * 1000 / runs
+    finally:
+        (level_loader.create_level_platforms, level_loader.Platform,
+         level_loader.Obstacle, level_loader.PowerUp) = originals
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--tiles', type=int, default=10000, help='platform tiles in the level')
+    parser.add_argument('--obstacles', type=int, default=1000, help='obstacles in the level')
+    parser.add_argument('--powerups', type=int, default=500, help='power-ups in the level')
+    parser.add_argument('--runs', type=int, default=5, help='level loads to average')
+    args = parser.parse_args()
+
+    level = generate_level(args.tiles, args.obstacles, args.powerups)
+    game = make_game(headless=True)
+
+    slotted = (Platform, Obstacle, PowerUp)
+    sprites = (SpritePlatform, SpriteObstacle, SpritePowerUp)
+    print(f"{'objects':>8} {'memory KiB':>11} {'load ms':>8}")
+    for label, classes, container in (('slots', slotted, list),
+                                      ('sprites', sprites, pygame.sprite.Group)):
+        memory = measure_objects(level, classes, container)
+        load_ms = measure_load(game, level, classes, args.runs)
+        print(f"{label:>8} {memory:>11.0f} {load_ms:>8.1f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Startup and menu frame-time benchmark.
+
+Reports how long Game() takes to construct, the first menu frame (which
+loads the menu image through the asset manager), and the mean time of later
+menu frames next to the old approach of decoding and scaling the JPEG on
+every frame.
+"""
+
+import argparse
+import os
+import time
+
+from _common import REPO_ROOT, pygame, time_frames
+
+from game_logic import Game
+from game_ui import draw_menu
+
+
+def load_menu_image_per_frame(screen):
+    """What draw_menu did before the asset manager: decode and scale each frame"""
+    meme_img = pygame.image.load(os.path.join(REPO_ROOT, "mario_meme.jpeg"))
+    img_width, img_height = meme_img.get_size()
+    if img_width > 400:
+        scale_factor = 400 / img_width
+        meme_img = pygame.transform.scale(meme_img, (int(img_width * scale_factor),
+                                                     int(img_height * scale_factor)))
+    screen.blit(meme_img, meme_img.get_rect(center=(700, 100)))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=120, help='menu frames to draw')
+    args = parser.parse_args()
+
+    pygame.init()
+    start = time.perf_counter()
+    game = Game()
+    startup_ms = (time.perf_counter() - start) * 1000
+
+    start = time.perf_counter()
+    draw_menu(game)
+    first_frame_ms = (time.perf_counter() - start) * 1000
+
+    cached_ms = time_frames(lambda: draw_menu(game), args.frames)
+    per_frame_ms = time_frames(lambda: load_menu_image_per_frame(game.screen), args.frames)
+
+    print(f"startup (Game()):            {startup_ms:8.2f} ms")
+    print(f"first menu frame:            {first_frame_ms:8.2f} ms")
+    print(f"menu frame, cached image:    {cached_ms:8.2f} ms")
+    print(f"image load+scale per frame:  {per_frame_ms:8.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
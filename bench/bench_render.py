@@ -0,0 +1,44 @@
+#!/usr/bin/env python3
+"""Frame-time benchmark for draw_game_ui.
+
+Reports the mean time to draw the sky background the old way (900
+per-row line draws) against blitting the cached gradient, and the mean
+time of a full draw_game_ui call for every level.
+"""
+
+import argparse
+
+from _common import make_game, pygame, time_frames
+
+from game_ui import draw_game_ui, get_background
+
+
+def draw_gradient_per_row(screen):
+    """The per-frame gradient draw draw_game_ui used before caching"""
+    for y in range(900):
+        color_r = int(135 + (50 * y / 900))
+        color_g = int(206 - (50 * y / 900))
+        color = (min(255, color_r), max(0, color_g), 235)
+        pygame.draw.line(screen, color, (0, y), (1400, y))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=300, help='frames to draw per run')
+    args = parser.parse_args()
+
+    game = make_game(1)
+    screen = game.screen
+    per_row_ms = time_frames(lambda: draw_gradient_per_row(screen), args.frames)
+    cached_ms = time_frames(lambda: screen.blit(get_background(screen.get_size()), (0, 0)), args.frames)
+    print(f"background per-row: {per_row_ms:.3f} ms  cached blit: {cached_ms:.3f} ms")
+
+    print(f"{'level':>5} {'draw_game_ui ms':>16}")
+    for level_num in range(1, 6):
+        game = make_game(level_num)
+        game.update()
+        print(f"{level_num:>5} {time_frames(lambda: draw_game_ui(game), args.frames):>16.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,287 @@
+#!/usr/bin/env python3
+"""Benchmark suite: simulation, collision, rendering, load time and memory per scenario.
+
+Scenarios are the five generated levels plus synthetic copies of one level
+(--synthetic-level) with every platform, obstacle, enemy and power-up
+repeated --scales times in the same world, so everything stays in view and
+awake. For each scenario the suite reports the fastest of --load-runs
+first-load times of Game.load_level, the per-frame time of Game.update,
+of check_collisions within it and of draw_game_ui on an offscreen surface
+(mean and percentiles, collected with the game's FrameProfiler), and the
+peak traced memory while loading and running the level.
+
+All scenarios are run --repeats times in rounds and every figure is the
+best over the rounds. Other processes only ever make a run slower, and
+they tend to do so for seconds at a time; spreading a scenario's runs over
+the whole suite keeps one slow stretch from spoiling all of them.
+
+Results can be written as JSON with --output. With --baseline the run is
+compared to an earlier output: a figure more than --tolerance plus an
+absolute NOISE_FLOOR above the baseline is a regression and the suite
+exits with status 1, so it can gate performance changes. Only medians are
+gated, as tail percentiles swing from run to run, and per-frame figures
+only for scenarios timed over at least MIN_GATED_FRAMES frames in both
+runs.
+
+No baseline is kept in the repository, since timings only compare on the
+same machine and settings. Create one there from the reference commit:
+
+    python bench/bench_suite.py --output baseline.json
+
+then check a change against it with --baseline baseline.json.
+"""
+
+import argparse
+import contextlib
+import gc
+import io
+import json
+import os
+import platform
+import sys
+import tracemalloc
+
+from _common import LAUNCH_DIR, make_game
+
+import pygame
+
+from game_logic import GameState
+from game_objects import PlatformGrid, WORLD_WIDTH
+from game_ui import draw_game_ui
+from level_generator import create_level_platforms
+from level_loader import LevelBuild, LevelLoader, build_level, build_static_objects
+from profiler import FrameProfiler
+
+WARMUP_FRAMES = 10
+MEMORY_FRAMES = 30
+MIN_GATED_FRAMES = 200  # Fewer frames give medians too noisy to gate on
+
+# Figures compared against the baseline; lower is better for all of them
+GATED_METRICS = ('load_ms', 'update_ms.p50', 'collisions_ms.p50', 'draw_ms.p50', 'peak_kib')
+FRAME_METRICS = ('update_ms', 'collisions_ms', 'draw_ms')
+
+# Allowed on top of --tolerance, so tiny figures are not gated on jitter
+NOISE_FLOOR = {'ms': 0.1, 'kib': 64}
+
+
+def scaled_builder(scale):
+    """Return a level build function repeating every object scale times.
+
+    Copies of platforms and obstacles overlap their originals exactly;
+    enemies and power-ups are spread a little so they do not move as one.
+    """
+    def build(level_num):
+        platform_data, obstacle_data, enemy_data, powerup_data = create_level_platforms(level_num)
+        enemy_data = [((x + copy * 13) % WORLD_WIDTH, y, enemy_type)
+                      for copy in range(scale) for x, y, enemy_type in enemy_data]
+        powerup_data = [((x + copy * 17) % WORLD_WIDTH, y, powerup_type)
+                        for copy in range(scale) for x, y, powerup_type in powerup_data]
+        platforms, obstacles, powerups = build_static_objects(platform_data * scale, obstacle_data * scale,
+                                                              powerup_data)
+        return LevelBuild(level_num, platforms, obstacles, enemy_data, powerups, PlatformGrid(platforms))
+    return build
+
+
+def scenarios(args):
+    """(name, level number, build function, frames) for every scenario to run"""
+    result = [(f'level{level_num}', level_num, build_level, args.frames) for level_num in range(1, 6)]
+    for scale in args.scales:
+        # Big crowds get fewer frames, but still enough to be gated
+        frames = max(min(args.frames, MIN_GATED_FRAMES), args.frames * 10 // max(scale, 10))
+        result.append((f'level{args.synthetic_level}x{scale}', args.synthetic_level,
+                       scaled_builder(scale), frames))
+    if args.scenarios:
+        result = [scenario for scenario in result if scenario[0] in args.scenarios]
+    return result
+
+
+def load(game, level_num):
+    """Load a level from scratch, as the first time it is played"""
+    game.compiled_levels.clear()
+    with contextlib.redirect_stdout(io.StringIO()):
+        game.start_level(level_num)
+    game.player_mushroom.take_damage = lambda damage: False
+
+
+@contextlib.contextmanager
+def collections_paused():
+    """Keep garbage collections, which land on whichever run triggers them, out of timings"""
+    gc.collect()
+    gc.disable()
+    try:
+        yield
+    finally:
+        gc.enable()
+
+
+def measure_load(game, level_num, runs):
+    """Fastest first-load time in milliseconds"""
+    profiler = FrameProfiler(window=runs, enabled=True)
+    with collections_paused():
+        for _ in range(runs):
+            profiler.begin_frame()
+            with profiler.scope('load'):
+                load(game, level_num)
+            profiler.end_frame()
+    return min(profiler.samples('load'))
+
+
+def measure_memory(game, level_num):
+    """Peak traced KiB while loading the level and running a few frames"""
+    gc.collect()
+    tracemalloc.start()
+    load(game, level_num)
+    for _ in range(MEMORY_FRAMES):
+        game.update()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return peak / 1024
+
+
+def measure_frames(game, level_num, frames, target):
+    """Per-frame update, collision and draw statistics in milliseconds"""
+    load(game, level_num)
+    for _ in range(WARMUP_FRAMES):
+        game.update()
+        draw_game_ui(game, target)
+
+    profiler = game.profiler = FrameProfiler(window=frames, enabled=True)
+    try:
+        with collections_paused():
+            for _ in range(frames):
+                profiler.begin_frame()
+                with profiler.scope('update'):
+                    game.update()
+                with profiler.scope('draw'):
+                    draw_game_ui(game, target)
+                profiler.end_frame()
+    finally:
+        game.profiler = FrameProfiler()
+    if game.state != GameState.PLAYING:
+        raise RuntimeError(f"level {level_num} stopped playing ({game.state.name}); timings are invalid")
+
+    summary = profiler.summary()
+    return {'update_ms': summary['update'], 'collisions_ms': summary['update.collisions'],
+            'draw_ms': summary['draw']}
+
+
+def best_of(runs):
+    """Per-figure minimum over several run_scenario results of one scenario"""
+    best = {}
+    for name, value in runs[0].items():
+        if isinstance(value, dict):
+            best[name] = {stat: min(run[name][stat] for run in runs) for stat in value}
+        else:
+            best[name] = min(run[name] for run in runs)
+    return best
+
+
+def run_scenario(game, level_num, build, frames, load_runs, target):
+    game.level_loader.shutdown()
+    game.level_loader = LevelLoader(build=build)
+    result = {'frames': frames}
+    result['load_ms'] = measure_load(game, level_num, load_runs)
+    result['peak_kib'] = measure_memory(game, level_num)
+    result.update(measure_frames(game, level_num, frames, target))
+    result.update(platforms=len(game.platforms), obstacles=len(game.obstacles),
+                  enemies=len(game.enemies), powerups=len(game.powerups))
+    return result
+
+
+def flatten(metrics):
+    """Map 'update_ms.p95'-style names to the numbers of one scenario"""
+    flat = {}
+    for name, value in metrics.items():
+        if isinstance(value, dict):
+            flat.update((f'{name}.{stat}', number) for stat, number in value.items())
+        else:
+            flat[name] = value
+    return flat
+
+
+def compare(results, baseline, tolerance):
+    """Print the change against baseline per gated metric; returns the regressions"""
+    regressions = []
+    print(f"\n{'scenario':<12} {'metric':<20} {'baseline':>10} {'current':>10} {'change':>8}")
+    for name, metrics in results['scenarios'].items():
+        base = baseline['scenarios'].get(name)
+        if base is None:
+            print(f"{name:<12} not in baseline")
+            continue
+        gate_frames = min(metrics['frames'], base['frames']) >= MIN_GATED_FRAMES
+        if not gate_frames:
+            print(f"{name:<12} per-frame figures not gated: fewer than {MIN_GATED_FRAMES} frames")
+        current, base = flatten(metrics), flatten(base)
+        for metric in GATED_METRICS:
+            if metric not in base or (not gate_frames and metric.startswith(FRAME_METRICS)):
+                continue
+            old, new = base[metric], current[metric]
+            change = (new - old) / old if old else 0.0
+            floor = NOISE_FLOOR['kib' if metric.endswith('kib') else 'ms']
+            regressed = new > old * (1 + tolerance) + floor
+            if regressed:
+                regressions.append((name, metric))
+            print(f"{name:<12} {metric:<20} {old:>10.3f} {new:>10.3f} {change:>+8.1%}"
+                  f"{'  REGRESSION' if regressed else ''}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--frames', type=int, default=600, help='frames to time per level')
+    parser.add_argument('--load-runs', type=int, default=25, help='level loads to time')
+    parser.add_argument('--repeats', type=int, default=3, help='rounds of all scenarios to take the best of')
+    parser.add_argument('--scales', type=int, nargs='*', default=[10, 100],
+                        help='object multipliers for the synthetic scenarios')
+    parser.add_argument('--synthetic-level', type=int, default=5, choices=range(1, 6),
+                        help='level the synthetic scenarios copy')
+    parser.add_argument('--entity-backend', choices=('sprites', 'numpy'), default='sprites')
+    parser.add_argument('--scenarios', nargs='*', help='only run these scenarios, e.g. level1 level5x10')
+    parser.add_argument('--output', metavar='PATH', help='write the results as JSON')
+    parser.add_argument('--baseline', metavar='PATH', help='compare against an earlier --output')
+    parser.add_argument('--tolerance', type=float, default=0.25,
+                        help='allowed slowdown or growth over the baseline (0.25 = 25%%)')
+    args = parser.parse_args()
+
+    # A real (dummy-driver) display gives the HUD its fonts; drawing goes to
+    # an offscreen surface of the same size
+    with contextlib.redirect_stdout(io.StringIO()):
+        game = make_game(entity_backend=args.entity_backend)
+    target = pygame.Surface(game.screen.get_size()).convert()
+
+    results = {
+        'environment': {'python': platform.python_version(), 'pygame': pygame.version.ver,
+                        'machine': platform.machine(), 'system': platform.system()},
+        'settings': {'frames': args.frames, 'load_runs': args.load_runs, 'repeats': args.repeats,
+                     'entity_backend': args.entity_backend},
+        'scenarios': {},
+    }
+    print(f"{'scenario':<12} {'objects':>8} {'load ms':>8} {'update p50':>10} {'p95':>7} "
+          f"{'collide p50':>11} {'draw p50':>8} {'p95':>7} {'peak KiB':>9}")
+    selected = scenarios(args)
+    rounds = {name: [] for name, _, _, _ in selected}
+    for _ in range(args.repeats):
+        for name, level_num, build, frames in selected:
+            rounds[name].append(run_scenario(game, level_num, build, frames, args.load_runs, target))
+    for name, runs in rounds.items():
+        result = results['scenarios'][name] = best_of(runs)
+        objects = result['platforms'] + result['obstacles'] + result['enemies'] + result['powerups']
+        print(f"{name:<12} {objects:>8} {result['load_ms']:>8.2f} {result['update_ms']['p50']:>10.3f} "
+              f"{result['update_ms']['p95']:>7.3f} {result['collisions_ms']['p50']:>11.3f} "
+              f"{result['draw_ms']['p50']:>8.3f} {result['draw_ms']['p95']:>7.3f} {result['peak_kib']:>9.0f}")
+    game.level_loader.shutdown()
+
+    if args.output:
+        with open(os.path.join(LAUNCH_DIR, args.output), 'w') as f:
+            json.dump(results, f, indent=2)
+    if args.baseline:
+        with open(os.path.join(LAUNCH_DIR, args.baseline)) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} regression(s) over {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,232 @@
+"""Optional NumPy struct-of-arrays backend for enemy and ally mushrooms.
+
+Instead of calling update() on every sprite, a batch keeps positions,
+velocities, timers and types in arrays and runs each rule of
+EnemyMushroom.update / Mushroom.update as one vectorized pass. The passes
+mirror the sprite code step for step, including pygame's rounding when a
+Rect is moved by a float and the order of random draws, so both backends
+produce the same game.
+"""
+
+try:
+    import numpy as np
+except ImportError:  # NumPy is optional; the sprite backend needs nothing extra
+    np = None
+
+from game_objects import *
+
+def require_numpy():
+    """Raise a clear error when the batched backend is requested without NumPy"""
+    if np is None:
+        raise RuntimeError("The numpy entity backend requires NumPy (pip install numpy)")
+
+def round_rect(values):
+    """Round like a pygame Rect coordinate assigned a float (half away from zero)"""
+    whole = np.trunc(values)
+    return whole + np.where(np.abs(values - whole) >= 0.5, np.sign(values), 0)
+
+def apply_physics(x, y, w, h, vel_x, vel_y, on_ground, platforms, mask=None, world_width=WORLD_WIDTH):
+    """Gravity, ground clamp, platform collisions and world bounds, in place.
+
+    Platforms are visited in grid order so each entity resolves collisions
+    exactly as its sprite would; platforms outside an entity's columns can
+    never overlap it, so visiting them changes nothing.
+    """
+    if mask is None:
+        mask = np.ones(len(x), dtype=bool)
+
+    vel_y[mask] += GRAVITY
+    y[mask] = round_rect(y[mask] + vel_y[mask])
+
+    grounded = mask & (y + h >= GROUND_Y)
+    y[grounded] = GROUND_Y - h[grounded]
+    vel_y[grounded] = 0
+    on_ground[mask] = grounded[mask]
+
+    for platform in platforms:
+        rect = platform.rect
+        hit = mask & (x < rect.right) & (x + w > rect.left) & (y < rect.bottom) & (y + h > rect.top)
+        if not hit.any():
+            continue
+        falling = hit & (vel_y > 0)
+        rising = hit & (vel_y < 0)
+        y[falling] = rect.top - h[falling]
+        vel_y[falling] = 0
+        on_ground[falling] = True
+        y[rising] = rect.bottom
+        vel_y[rising] = 0
+
+    out_of_bounds = mask & ((x < 0) | (x + w > world_width))
+    vel_x[out_of_bounds] = -vel_x[out_of_bounds]
+
+class EnemyBatch:
+    """Enemy mushrooms as arrays; the arrays are the authoritative state.
+
+    Sprites keep their rects in sync every update for drawing and collision
+    checks; push(full=True) also copies velocities and timers back.
+    """
+
+    def __init__(self, enemies, rng=random, world_width=WORLD_WIDTH):
+        require_numpy()
+        self.sprites = list(enemies)
+        self.rng = rng
+        self.world_width = world_width
+        sprites = self.sprites
+        self.x = np.array([e.rect.x for e in sprites], dtype=float)
+        self.y = np.array([e.rect.y for e in sprites], dtype=float)
+        self.w = np.array([e.rect.width for e in sprites], dtype=float)
+        self.h = np.array([e.rect.height for e in sprites], dtype=float)
+        self.half_w = np.array([e.rect.width // 2 for e in sprites], dtype=float)
+        self.vel_x = np.array([e.vel_x for e in sprites], dtype=float)
+        self.vel_y = np.array([e.vel_y for e in sprites], dtype=float)
+        self.on_ground = np.array([e.on_ground for e in sprites], dtype=bool)
+        self.ai_timer = np.array([e.ai_timer for e in sprites], dtype=np.int64)
+        self.attack_cooldown = np.array([e.attack_cooldown for e in sprites], dtype=np.int64)
+        self.special_timer = np.array([e.special_timer for e in sprites], dtype=np.int64)
+        self.patrol_start_x = np.array([e.patrol_start_x for e in sprites], dtype=float)
+        self.patrol_range = np.array([e.patrol_range for e in sprites], dtype=float)
+
+        rules = np.array([ENEMY_AI_RULES[e.enemy_type] for e in sprites], dtype=float).reshape(-1, 5)
+        self.chase_range, self.chase_speed, self.jump_range, self.jump_speed, self.jump_period = rules.T
+        self.jump_period = self.jump_period.astype(np.int64)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def update(self, platforms, player_mushroom, mario=None, left=float('-inf'), right=float('inf')):
+        """Advance every enemy overlapping [left, right] one frame, like EnemyMushroom.update.
+
+        Returns the enemy sprites that were advanced.
+        """
+        if not self.sprites:
+            return []
+        x, vel_x, vel_y = self.x, self.vel_x, self.vel_y
+        awake = (x + self.w > left) & (x < right)
+        if not awake.any():
+            return []
+        self.ai_timer[awake] += 1
+        self.attack_cooldown[awake] = np.maximum(self.attack_cooldown[awake] - 1, 0)
+        self.special_timer[awake] += 1
+
+        # Chase or patrol
+        distance = player_mushroom.rect.centerx - (x + self.half_w)
+        chasing = awake & (np.abs(distance) < self.chase_range)
+        vel_x[chasing] = np.where(distance > 0, self.chase_speed, -self.chase_speed)[chasing]
+
+        player_above = player_mushroom.rect.y < self.y
+        jump_at_player = chasing & (np.abs(distance) < self.jump_range) & self.on_ground & player_above
+        periodic = self.jump_period > 0
+        jump_periodic = chasing & periodic & self.on_ground
+        jump_periodic[periodic] &= self.ai_timer[periodic] % self.jump_period[periodic] == 0
+        jumping = jump_at_player | jump_periodic
+        vel_y[jumping] = self.jump_speed[jumping]
+
+        patrolling = awake & ~chasing
+        turn = patrolling & (np.abs(x - self.patrol_start_x) > self.patrol_range)
+        vel_x[turn] = -vel_x[turn]
+        for i in np.flatnonzero(patrolling & ~turn & (self.ai_timer % 120 == 0)):
+            vel_x[i] = self.rng.choice([-ENEMY_SPEED, ENEMY_SPEED])
+        # Patrol moves once itself, then the AI moves again
+        x[patrolling] = round_rect(x[patrolling] + vel_x[patrolling])
+        x[awake] = round_rect(x[awake] + vel_x[awake])
+
+        apply_physics(x, self.y, self.w, self.h, vel_x, vel_y, self.on_ground, platforms, awake,
+                      self.world_width)
+        self.push(awake=awake)
+        return [self.sprites[i] for i in np.flatnonzero(awake).tolist()]
+
+    def push(self, full=False, awake=None):
+        """Copy array state back onto the sprites (rects of awake ones only, if given)"""
+        if awake is None:
+            indices = range(len(self.sprites))
+        else:
+            indices = np.flatnonzero(awake).tolist()
+        xs, ys = self.x.tolist(), self.y.tolist()
+        for i in indices:
+            rect = self.sprites[i].rect
+            rect.x = xs[i]
+            rect.y = ys[i]
+        if full:
+            for i, sprite in enumerate(self.sprites):
+                sprite.vel_x = self.vel_x[i].item()
+                sprite.vel_y = self.vel_y[i].item()
+                sprite.on_ground = bool(self.on_ground[i])
+                sprite.ai_timer = int(self.ai_timer[i])
+                sprite.attack_cooldown = int(self.attack_cooldown[i])
+                sprite.special_timer = int(self.special_timer[i])
+
+class AllyBatch:
+    """Ally mushrooms as arrays.
+
+    check_collisions changes allies (landing on Mario), so the sprites stay
+    authoritative: each update pulls their state, runs the vectorized pass
+    and pushes the result back.
+    """
+
+    def __init__(self, mushrooms, rng=random, world_width=WORLD_WIDTH):
+        require_numpy()
+        self.sprites = list(mushrooms)
+        self.rng = rng
+        self.world_width = world_width
+        self.w = np.array([m.rect.width for m in self.sprites], dtype=float)
+        self.h = np.array([m.rect.height for m in self.sprites], dtype=float)
+        self.half_w = np.array([m.rect.width // 2 for m in self.sprites], dtype=float)
+
+    def __len__(self):
+        return len(self.sprites)
+
+    def pull(self):
+        """Read sprite state into arrays"""
+        sprites = self.sprites
+        self.x = np.array([m.rect.x for m in sprites], dtype=float)
+        self.y = np.array([m.rect.y for m in sprites], dtype=float)
+        self.vel_x = np.array([m.vel_x for m in sprites], dtype=float)
+        self.vel_y = np.array([m.vel_y for m in sprites], dtype=float)
+        self.on_ground = np.array([m.on_ground for m in sprites], dtype=bool)
+        self.on_mario = np.array([m.on_mario for m in sprites], dtype=bool)
+        self.jump_cooldown = np.array([m.jump_cooldown for m in sprites], dtype=np.int64)
+
+    def update(self, platforms, mario, left=float('-inf'), right=float('inf')):
+        """Advance every ally overlapping [left, right] one frame, like Mushroom.update"""
+        if not self.sprites:
+            return
+        self.pull()
+        x, y, vel_x, vel_y = self.x, self.y, self.vel_x, self.vel_y
+        awake = (x + self.w > left) & (x < right)
+        self.jump_cooldown[awake] = np.maximum(self.jump_cooldown[awake] - 1, 0)
+
+        # Riders follow Mario and occasionally hop off; they skip the rest
+        riding = awake & self.on_mario
+        x[riding] = mario.rect.centerx - self.half_w[riding]
+        y[riding] = mario.rect.top - self.h[riding]
+        for i in np.flatnonzero(riding):
+            if self.rng.randint(1, 240) == 1:
+                self.on_mario[i] = False
+                vel_y[i] = JUMP_SPEED
+                vel_x[i] = self.rng.choice([-MUSHROOM_SPEED * 2, MUSHROOM_SPEED * 2])
+
+        active = awake & ~riding
+        distance = mario.rect.centerx - (x + self.half_w)
+        steer = active & (np.abs(distance) > 60)
+        vel_x[steer] = np.where(distance > 0, MUSHROOM_SPEED, -MUSHROOM_SPEED)[steer]
+        x[active] = round_rect(x[active] + vel_x[active])
+
+        jumping = (active & (np.abs(distance) < 100) & self.on_ground
+                   & (self.jump_cooldown == 0) & (mario.rect.y < y))
+        vel_y[jumping] = JUMP_SPEED * 1.2
+        self.jump_cooldown[jumping] = 120
+
+        apply_physics(x, y, self.w, self.h, vel_x, vel_y, self.on_ground, platforms, active,
+                      self.world_width)
+        self.push()
+
+    def push(self):
+        """Copy array state back onto the sprites"""
+        for i, sprite in enumerate(self.sprites):
+            sprite.rect.x = int(self.x[i])
+            sprite.rect.y = int(self.y[i])
+            sprite.vel_x = self.vel_x[i].item()
+            sprite.vel_y = self.vel_y[i].item()
+            sprite.on_ground = bool(self.on_ground[i])
+            sprite.on_mario = bool(self.on_mario[i])
+            sprite.jump_cooldown = int(self.jump_cooldown[i])
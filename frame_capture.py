@@ -0,0 +1,125 @@
+"""Frame capture from offscreen rendering.
+
+game_ui.draw_screen can draw into any surface, and a headless game renders
+without a window (call Game.create_fonts first so text can be drawn), so
+frames can be captured on machines without a display or under SDL's dummy
+video driver: for golden-image tests, thumbnails or rendering benchmarks.
+
+PngSequence saves numbered PNG files. RawFrameStream appends each frame's
+pixels to one file straight from the surface's buffer, without copying
+them, and describes the pixel layout in a JSON file next to it.
+frame_array gives a zero-copy NumPy view of a surface's pixels.
+"""
+
+import json
+import os
+
+import pygame
+
+try:
+    import numpy
+except ImportError:  # Only frame_array needs NumPy
+    numpy = None
+
+from game_ui import draw_screen, draw_ui
+
+def surface_layout(surface):
+    """Everything needed to interpret a surface's raw pixel bytes"""
+    return {
+        'width': surface.get_width(),
+        'height': surface.get_height(),
+        'pitch': surface.get_pitch(),
+        'bytes_per_pixel': surface.get_bytesize(),
+        'masks': list(surface.get_masks()),
+    }
+
+def frame_array(surface):
+    """(width, height, 3) RGB array viewing the surface's pixels without a copy.
+
+    The surface stays locked, so it cannot be blitted, while the array is
+    alive; copy the array to keep a frame beyond that.
+    """
+    if numpy is None:
+        raise RuntimeError("frame_array requires NumPy (pip install numpy)")
+    return pygame.surfarray.pixels3d(surface)
+
+def render_frame(game, target=None):
+    """Draw the game's current state into target (a new surface by default) and return it"""
+    if target is None:
+        target = pygame.Surface(game.screen.get_size())
+    draw_screen(game, target)
+    return target
+
+class PngSequence:
+    """Writes frames as frame_00000.png, frame_00001.png, ... in a directory"""
+
+    def __init__(self, directory, prefix='frame'):
+        os.makedirs(directory, exist_ok=True)
+        self.directory = directory
+        self.prefix = prefix
+        self.count = 0
+
+    def write(self, surface):
+        """Save one frame and return its path"""
+        path = os.path.join(self.directory, f"{self.prefix}_{self.count:05d}.png")
+        pygame.image.save(surface, path)
+        self.count += 1
+        return path
+
+    def close(self):
+        pass
+
+class RawFrameStream:
+    """Appends raw frames to one file, layout in a .json file next to it.
+
+    Frames are written back to back, each pitch * height bytes, exactly as
+    the surface stores them; all frames must share one layout.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.file = open(path, 'wb')
+        self.layout = None
+        self.count = 0
+
+    def write(self, surface):
+        """Append one frame"""
+        layout = surface_layout(surface)
+        if self.layout is None:
+            self.layout = layout
+        elif layout != self.layout:
+            raise ValueError(f"Frame layout changed from {self.layout} to {layout}")
+        # The buffer proxy exposes the pixels themselves, so nothing is copied
+        self.file.write(surface.get_buffer())
+        self.count += 1
+
+    def close(self):
+        """Close the stream and write its layout file"""
+        self.file.close()
+        with open(self.path + '.json', 'w') as f:
+            json.dump({**(self.layout or {}), 'frames': self.count}, f, indent=2)
+
+def open_capture(path):
+    """RawFrameStream for a .raw path, otherwise a PngSequence in directory path"""
+    if str(path).lower().endswith('.raw'):
+        return RawFrameStream(path)
+    return PngSequence(path)
+
+class CaptureRenderer:
+    """Draw function that also hands every `every`-th frame to a writer.
+
+    Wraps another draw function (draw_ui by default) for FixedTimestepLoop
+    or replay_recording and captures what it left on game.screen.
+    """
+
+    def __init__(self, writer, draw=draw_ui, every=1):
+        self.writer = writer
+        self.draw_frame = draw
+        self.every = every
+        self.frames = 0
+
+    def draw(self, game):
+        self.draw_frame(game)
+        if self.frames % self.every == 0:
+            self.writer.write(game.screen)
+        self.frames += 1
@@ -0,0 +1,153 @@
+import pygame
+import struct
+from collections import namedtuple
+from level_generator import ENDLESS_LEVEL
+
+# Player controls for one simulation step
+InputState = namedtuple('InputState', ['left', 'right', 'jump'])
+NO_INPUT = InputState(False, False, False)
+
+class KeyboardInput:
+    """Live input: held movement keys plus jump presses from KEYDOWN events"""
+    
+    def __init__(self):
+        self.jump_pressed = False
+    
+    def press_jump(self):
+        """Queue a jump for the next step"""
+        self.jump_pressed = True
+    
+    def poll(self):
+        """Return the controls for this step"""
+        keys = pygame.key.get_pressed()
+        jump = self.jump_pressed
+        self.jump_pressed = False
+        return InputState(keys[pygame.K_LEFT] or keys[pygame.K_a],
+                          keys[pygame.K_RIGHT] or keys[pygame.K_d],
+                          jump)
+
+class ScriptedInput:
+    """Input that plays back a sequence of InputState, then stands still"""
+    
+    def __init__(self, frames=()):
+        self.frames = iter(frames)
+    
+    def press_jump(self):
+        """Keyboard jumps are ignored; the script decides"""
+        pass
+    
+    def poll(self):
+        """Return the controls for this step"""
+        return next(self.frames, NO_INPUT)
+
+# Recording format: RECORDING_MAGIC and a version byte, then for version 2
+# a SETTINGS_HEADER (active margin, entity backend name), then one segment
+# per level start. A segment is a SEGMENT_HEADER (seed, level, lives,
+# score, frame count) followed by one byte per simulation step with the
+# bits below. The seed is signed, as --seed accepts any 64-bit integer
+# including negative ones. Version 1 files have no settings header.
+RECORDING_MAGIC = b'SMRP'
+RECORDING_VERSION = 2
+SETTINGS_HEADER = struct.Struct('<d8s')
+SEGMENT_HEADER = struct.Struct('<qiiiI')
+LEFT_BIT, RIGHT_BIT, JUMP_BIT = 1, 2, 4
+
+RecordingSegment = namedtuple('RecordingSegment', ['seed', 'level', 'lives', 'score', 'frames'])
+# active_margin and entity_backend are None for version 1 recordings
+Recording = namedtuple('Recording', ['active_margin', 'entity_backend', 'segments'])
+
+def encode_input(controls):
+    """Pack an InputState into one byte"""
+    return (LEFT_BIT if controls.left else 0) | (RIGHT_BIT if controls.right else 0) | (JUMP_BIT if controls.jump else 0)
+
+def decode_input(byte):
+    """Unpack a byte written by encode_input"""
+    return InputState(bool(byte & LEFT_BIT), bool(byte & RIGHT_BIT), bool(byte & JUMP_BIT))
+
+class InputRecorder:
+    """Records the controls of every simulation step for later replay.
+
+    Game calls begin() whenever a level starts and record() each step, so a
+    recording holds everything needed to rebuild the run from its seed,
+    together with the game's activation margin and entity backend.
+    """
+    
+    def __init__(self):
+        self.segments = []
+        self.active_margin = 1.0
+        self.entity_backend = 'sprites'
+    
+    def begin(self, game, level_num):
+        """Start a segment at the beginning of a level"""
+        self.active_margin = game.active_margin
+        self.entity_backend = game.entity_backend
+        self.segments.append(RecordingSegment(game.seed, level_num, game.lives, game.score, bytearray()))
+    
+    def record(self, controls):
+        """Append one step's controls"""
+        if self.segments:
+            self.segments[-1].frames.append(encode_input(controls))
+    
+    def save(self, path):
+        """Write the recording to path"""
+        with open(path, 'wb') as f:
+            f.write(RECORDING_MAGIC + bytes([RECORDING_VERSION]))
+            f.write(SETTINGS_HEADER.pack(self.active_margin, self.entity_backend.encode('ascii')))
+            for segment in self.segments:
+                f.write(SEGMENT_HEADER.pack(segment.seed, segment.level, segment.lives, segment.score,
+                                            len(segment.frames)))
+                f.write(segment.frames)
+
+def load_recording(path):
+    """Read a Recording written by InputRecorder.save"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    if not data.startswith(RECORDING_MAGIC) or len(data) <= len(RECORDING_MAGIC):
+        raise ValueError(f"{path} is not an input recording")
+    version = data[len(RECORDING_MAGIC)]
+    if version not in (1, RECORDING_VERSION):
+        raise ValueError(f"{path} has unsupported recording version {version}")
+    
+    offset = len(RECORDING_MAGIC) + 1
+    active_margin = entity_backend = None
+    if version >= 2:
+        active_margin, backend = SETTINGS_HEADER.unpack_from(data, offset)
+        entity_backend = backend.rstrip(b'\0').decode('ascii')
+        offset += SETTINGS_HEADER.size
+    segments = []
+    while offset < len(data):
+        seed, level, lives, score, count = SEGMENT_HEADER.unpack_from(data, offset)
+        offset += SEGMENT_HEADER.size
+        segments.append(RecordingSegment(seed, level, lives, score, bytes(data[offset:offset + count])))
+        offset += count
+    return Recording(active_margin, entity_backend, segments)
+
+def replay_recording(game, recording, draw=None):
+    """Re-run a Recording on game, one update per recorded step.
+
+    The recorded activation margin and entity backend replace the game's
+    own (version 1 recordings keep the game's). Run on a headless game this
+    plays back as fast as the CPU allows and reproduces the recorded
+    session exactly. draw, if given, is called with the game after every
+    step, e.g. to capture the frames.
+    """
+    if recording.active_margin is not None:
+        game.active_margin = recording.active_margin
+    if recording.entity_backend is not None:
+        game.set_entity_backend(recording.entity_backend)
+    for segment in recording.segments:
+        game.seed = segment.seed
+        game.lives = segment.lives
+        game.score = segment.score
+        if segment.level != ENDLESS_LEVEL:
+            # As in live play, where a fixed level is made the current one
+            # before it starts; endless mode leaves the unlocked level alone.
+            # start_level sets loaded_level either way
+            game.current_level = segment.level
+        game.input_source = ScriptedInput(decode_input(byte) for byte in segment.frames)
+        game.start_level(segment.level)
+        for _ in range(len(segment.frames)):
+            game.update()
+            if draw:
+                draw(game)
+    return game
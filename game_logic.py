@@ -1,13 +1,19 @@
 import pygame
 import json
 import os
+import random
 from enum import Enum
 from game_objects import *
 from level_generator import *
+from asset_manager import AssetManager
+from game_input import KeyboardInput, ScriptedInput
+from entity_batch import EnemyBatch, AllyBatch, require_numpy
+from level_streaming import ChunkStreamer
+from profiler import FrameProfiler
+from level_loader import (LevelLoader, CompiledLevel, build_static_objects, capture_state,
+                          restore_state)
 
-# Screen constants
-SCREEN_WIDTH = 1400
-SCREEN_HEIGHT = 900
+ENDLESS_MARIO_LEVEL = 3  # Mario's AI level in the endless mode
 
 class GameState(Enum):
     MENU = 1
@@ -18,15 +24,42 @@ class GameState(Enum):
     LEVEL_SELECT = 6
 
 class Game:
-    def __init__(self):
-        self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
-        pygame.display.set_caption("Супер Гриб: Битва с Врагами!")
+    def __init__(self, headless=False, input_source=None, seed=None, entity_backend='sprites',
+                 active_margin=1.0):
+        """Create the game, showing the menu.
+
+        headless -- no window, fonts or save file; draws offscreen and is stepped through update()
+        input_source -- supplies the controls each step; the keyboard, or no input when headless
+        seed -- reseeds self.rng at every level load, so a seed plus the input replays a run
+        entity_backend -- 'sprites', or 'numpy' to step enemies and allies as arrays (see entity_batch)
+        active_margin -- screen widths beyond the camera within which entities are updated
+        """
+        self.set_entity_backend(entity_backend)
+        self.active_margin = active_margin
+        self.enemy_batch = None
+        self.ally_batch = None
+        self.headless = headless
+        self.seed = seed if seed is not None else random.randrange(2 ** 32)
+        self.rng = random.Random(self.seed)
+        self.recorder = None
+        self.profiler = FrameProfiler()
+        if headless:
+            self.screen = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        else:
+            self.screen = pygame.display.set_mode((SCREEN_WIDTH, SCREEN_HEIGHT))
+            pygame.display.set_caption("Супер Гриб: Битва с Врагами!")
+        if input_source is None:
+            # Without a window there is no keyboard to poll
+            input_source = ScriptedInput() if headless else KeyboardInput()
+        self.input_source = input_source
         self.clock = pygame.time.Clock()
         self.running = True
         self.state = GameState.MENU
+        self.redraw_requested = False
         
         # Game data
         self.current_level = 1
+        self.loaded_level = None
         self.max_level = 5
         self.score = 0
         self.lives = 3
@@ -34,23 +67,47 @@ class Game:
         self.timer = 0
         
         # Load game data
-        self.load_game_data()
+        self.assets = AssetManager()
+        if not headless:
+            self.load_game_data()
         self.load_textures()
         
         # Fonts
-        self.font_large = pygame.font.Font(None, 72)
-        self.font_medium = pygame.font.Font(None, 48)
-        self.font_small = pygame.font.Font(None, 36)
+        if headless:
+            self.font_large = self.font_medium = self.font_small = None
+        else:
+            self.create_fonts()
         
         # Camera
         self.camera_x = 0
+        self.world_width = WORLD_WIDTH
+        self.streamer = None
+        self.level_loader = LevelLoader()
+        self.compiled_levels = {}
         
         # Game objects
-        self.platforms = pygame.sprite.Group()
+        self.platforms = []
+        self.platform_grid = PlatformGrid(())
         self.enemies = pygame.sprite.Group()
-        self.powerups = pygame.sprite.Group()
-        self.obstacles = pygame.sprite.Group()
+        self.enemy_index = ProximityIndex()
+        self.powerup_index = ProximityIndex()
+        self.powerups = []
+        self.obstacles = []
         self.mushrooms = pygame.sprite.Group()
+        self.collision_target_counts = None
+        self.world_version = 0  # Bumped whenever level objects are added or removed wholesale
+    
+    def create_fonts(self):
+        """Create the UI fonts; a headless game needs them to render frames"""
+        pygame.font.init()
+        self.font_large = pygame.font.Font(None, 72)
+        self.font_medium = pygame.font.Font(None, 48)
+        self.font_small = pygame.font.Font(None, 36)
+    
+    def log(self, message):
+        """Print a status message; headless games run silently"""
+        if not self.headless:
+            print(message)
     
     def load_game_data(self):
         """Load save game"""
@@ -64,6 +121,8 @@ class Game:
     
     def save_game_data(self):
         """Save game"""
+        if self.headless:
+            return
         data = {'current_level': self.current_level, 'total_score': self.score}
         with open('savegame.json', 'w') as f:
             json.dump(data, f)
@@ -94,6 +153,11 @@ class Game:
             'cloud': create_platform_sprite(WHITE),
             'metal': create_platform_sprite(GRAY)
         }
+        # Tiled span images, filled per (type, width) as levels load
+        self.platform_span_images = {}
+        
+        # Obstacle animation strips, filled per (type, width, height) as levels load
+        self.obstacle_images = {}
         
         # Power-up sprites
         self.powerup_images = {
@@ -103,64 +167,188 @@ class Game:
             PowerUpType.MAGNET: create_powerup_sprite(ORANGE)
         }
         
-        print("All textures created!")
+        self.log("All textures created!")
     
     def load_level(self, level_num):
-        """Load level with enhanced generation"""
+        """Load level with enhanced generation; ENDLESS_LEVEL loads the endless mode"""
         # Clear all sprite groups
-        self.platforms.empty()
+        self.platforms.clear()
         self.enemies.empty()
-        self.powerups.empty()
-        self.obstacles.empty()
+        self.powerups.clear()
+        self.obstacles.clear()
         self.mushrooms.empty()
         
+        # The old level's batches must not push their state onto sprites
+        # that are about to be restored
+        self.enemy_batch = self.ally_batch = None
+        
+        self.loaded_level = level_num
         self.time_left = 120
         self.timer = 0
         
-        # Generate level content
-        platform_data, obstacle_data, enemy_data, powerup_data = create_level_platforms(level_num)
-        
-        # Create platforms
-        for data in platform_data:
-            if len(data) == 5:
-                x, y, w, h, p_type = data
-                platform = Platform(x, y, w, h, p_type)
-                self.platforms.add(platform)
+        compiled = self.compiled_levels.get((self.seed, level_num))
+        if compiled is not None:
+            # Respawn: put the level back as it was first loaded
+            platform_grid = self.restore_level(compiled)
+        else:
+            platform_grid = self.create_level(level_num)
+            if level_num != ENDLESS_LEVEL:
+                self.compile_level(level_num, platform_grid)
         
-        # Create obstacles
-        for obs_data in obstacle_data:
-            x, y, w, h, obs_type = obs_data
-            obstacle = Obstacle(x, y, w, h, obs_type)
-            self.obstacles.add(obstacle)
+        self.world_changed(platform_grid)
         
-        # Create enemies
-        for enemy_data in enemy_data:
-            x, y, enemy_type = enemy_data
-            enemy_image = self.enemy_images[enemy_type]
-            enemy = EnemyMushroom(x, y, enemy_type, enemy_image)
-            self.enemies.add(enemy)
+        self.log(f"Level {level_num} loaded with {len(self.enemies)} enemies and {len(self.obstacles)} obstacles!")
+    
+    def create_level(self, level_num):
+        """Create every object of a level into the emptied groups; returns its platform grid"""
+        self.rng.seed(f"{self.seed}:{level_num}")
         
-        # Create power-ups
-        for powerup_data in powerup_data:
-            x, y, powerup_type = powerup_data
-            powerup = PowerUp(x, y, powerup_type)
-            self.powerups.add(powerup)
+        if level_num == ENDLESS_LEVEL:
+            # Chunks around the start are generated now, the rest while playing
+            self.world_width = ENDLESS_WORLD_WIDTH
+            self.streamer = ChunkStreamer(self, self.seed)
+            self.streamer.fill(0)
+            mario_level = ENDLESS_MARIO_LEVEL
+            platform_grid = None
+        else:
+            # Commit the level build, prefetched in the background if possible
+            self.world_width = WORLD_WIDTH
+            self.streamer = None
+            build = self.level_loader.take(level_num)
+            self.add_level_content(build.platforms, build.obstacles, build.enemy_data, build.powerups)
+            mario_level = level_num
+            platform_grid = build.platform_grid
         
         # Create Mario and player
-        mario_x = 1000 + (level_num * 200)
-        self.mario = Mario(mario_x, SCREEN_HEIGHT - 200, self.mario_image, level_num)
+        mario_x = 1000 + (mario_level * 200)
+        self.mario = Mario(mario_x, SCREEN_HEIGHT - 200, self.mario_image, mario_level, self.rng,
+                           self.world_width)
         
         player_x = 100
-        self.player_mushroom = PlayerMushroom(player_x, SCREEN_HEIGHT - 200, self.player_mushroom_image)
+        self.player_mushroom = PlayerMushroom(player_x, SCREEN_HEIGHT - 200, self.player_mushroom_image,
+                                              self.world_width)
         self.mushrooms.add(self.player_mushroom)
         
         # Create ally mushrooms (fewer due to enemy threat)
-        ally_count = max(1, 3 - level_num // 2)
+        ally_count = max(1, 3 - mario_level // 2)
         for i in range(ally_count):
-            mushroom = Mushroom(400 + i * 300, SCREEN_HEIGHT - 250, self.mushroom_image)
+            mushroom = Mushroom(400 + i * 300, SCREEN_HEIGHT - 250, self.mushroom_image, self.rng,
+                                self.world_width)
             self.mushrooms.add(mushroom)
         
-        print(f"Level {level_num} loaded with {len(self.enemies)} enemies and {len(self.obstacles)} obstacles!")
+        return platform_grid
+    
+    def compile_level(self, level_num, platform_grid):
+        """Cache the just-created level with a snapshot of its initial state"""
+        allies = [m for m in self.mushrooms if m is not self.player_mushroom]
+        dynamic = [*self.obstacles, *self.enemies, *self.powerups, self.mario, self.player_mushroom, *allies]
+        compiled = CompiledLevel(list(self.platforms), list(self.obstacles), list(self.enemies),
+                                 list(self.powerups), self.mario, self.player_mushroom, allies,
+                                 platform_grid, self.rng.getstate(),
+                                 [(obj, capture_state(obj)) for obj in dynamic])
+        # Only levels of the current seed can ever be restored
+        self.compiled_levels = {key: value for key, value in self.compiled_levels.items()
+                                if key[0] == self.seed}
+        self.compiled_levels[(self.seed, level_num)] = compiled
+    
+    def restore_level(self, compiled):
+        """Reset a compiled level to its initial state; returns its platform grid"""
+        for obj, state in compiled.states:
+            restore_state(obj, state)
+        self.rng.setstate(compiled.rng_state)
+        self.world_width = WORLD_WIDTH
+        self.streamer = None
+        self.platforms.extend(compiled.platforms)
+        self.obstacles.extend(compiled.obstacles)
+        self.enemies.add(*compiled.enemies)
+        self.powerups.extend(compiled.powerups)
+        self.mario = compiled.mario
+        self.player_mushroom = compiled.player
+        self.mushrooms.add(self.player_mushroom, *compiled.allies)
+        return compiled.platform_grid
+    
+    def spawn_level_content(self, platform_data, obstacle_data, enemy_data, powerup_data):
+        """Create level objects from generator data; returns the new platforms, obstacles and power-ups"""
+        platforms, obstacles, powerups = build_static_objects(platform_data, obstacle_data, powerup_data)
+        self.add_level_content(platforms, obstacles, enemy_data, powerups)
+        return platforms, obstacles, powerups
+    
+    def add_level_content(self, platforms, obstacles, enemy_data, powerups):
+        """Add built level objects, creating the enemies and any missing images"""
+        for platform in platforms:
+            key = (platform.platform_type, platform.rect.width)
+            if key not in self.platform_span_images:
+                tile = self.platform_images.get(key[0], self.platform_images['normal'])
+                self.platform_span_images[key] = create_platform_span_sprite(tile, key[1])
+        self.platforms.extend(platforms)
+        
+        for obstacle in obstacles:
+            key = (obstacle.obstacle_type, obstacle.rect.width, obstacle.rect.height)
+            if key not in self.obstacle_images:
+                self.obstacle_images[key] = create_obstacle_frames(*key)
+        self.obstacles.extend(obstacles)
+        
+        # Create enemies
+        for enemy_data in enemy_data:
+            x, y, enemy_type = enemy_data
+            enemy_image = self.enemy_images[enemy_type]
+            enemy = EnemyMushroom(x, y, enemy_type, enemy_image, self.rng, self.world_width)
+            self.enemies.add(enemy)
+        
+        self.powerups.extend(powerups)
+    
+    def remove_level_content(self, platforms, obstacles, left, right):
+        """Remove the given platforms and obstacles, and every enemy, ally and
+        power-up outside [left, right). Mario and the player always stay."""
+        platforms = set(platforms)
+        obstacles = set(obstacles)
+        self.platforms[:] = [p for p in self.platforms if p not in platforms]
+        self.obstacles[:] = [o for o in self.obstacles if o not in obstacles]
+        self.powerups[:] = [p for p in self.powerups if left <= p.rect.centerx < right]
+        for enemy in [e for e in self.enemies if not left <= e.rect.centerx < right]:
+            self.enemies.remove(enemy)
+        for mushroom in [m for m in self.mushrooms if not left <= m.rect.centerx < right]:
+            if mushroom is not self.player_mushroom:
+                self.mushrooms.remove(mushroom)
+    
+    def world_changed(self, platform_grid=None):
+        """Rebuild everything indexed over level objects after some were added or removed.
+
+        platform_grid may be passed in when it was already built over
+        self.platforms, as level builds do.
+        """
+        # Platforms never move, so the collision grid only changes here
+        self.platform_grid = platform_grid or PlatformGrid(self.platforms)
+        self.rebuild_entity_batches()
+        self.build_collision_targets()
+        self.enemy_index = ProximityIndex(self.enemies)
+        self.powerup_index = ProximityIndex(self.powerups)
+        self.world_version += 1
+    
+    def set_entity_backend(self, entity_backend):
+        """Choose 'sprites' or 'numpy' entity updates; takes effect when a level loads"""
+        if entity_backend not in ('sprites', 'numpy'):
+            raise ValueError(f"Unknown entity backend: {entity_backend}")
+        if entity_backend == 'numpy':
+            require_numpy()
+        self.entity_backend = entity_backend
+
+    def rebuild_entity_batches(self):
+        """Rebuild the batched entity arrays after enemies or allies change"""
+        if self.entity_backend == 'numpy':
+            if self.enemy_batch is not None:
+                # The enemy arrays are authoritative; save their state first
+                self.enemy_batch.push(full=True)
+            allies = [m for m in self.mushrooms if m is not self.player_mushroom]
+            self.enemy_batch = EnemyBatch(self.enemies, self.rng, self.world_width)
+            self.ally_batch = AllyBatch(allies, self.rng, self.world_width)
+    
+    def start_level(self, level_num):
+        """Load a level and start playing it"""
+        if self.recorder:
+            self.recorder.begin(self, level_num)
+        self.load_level(level_num)
+        self.state = GameState.PLAYING
     
     def run(self):
         """Main game loop"""
@@ -179,27 +367,34 @@ class Game:
                 self.running = False
             elif event.type == pygame.KEYDOWN:
                 self.handle_keydown(event.key)
+            elif event.type == pygame.WINDOWEXPOSED:
+                # The window contents were lost; renderers that skip
+                # unchanged frames must repaint
+                self.redraw_requested = True
     
     def handle_keydown(self, key):
         """Handle key presses"""
-        if self.state == GameState.MENU:
+        if key == pygame.K_F3:
+            self.profiler.toggle_overlay()
+            self.redraw_requested = True
+        elif self.state == GameState.MENU:
             if key == pygame.K_RETURN:
-                self.load_level(self.current_level)
-                self.state = GameState.PLAYING
+                self.start_level(self.current_level)
             elif key == pygame.K_l:
                 self.state = GameState.LEVEL_SELECT
+            elif key == pygame.K_e:
+                self.start_level(ENDLESS_LEVEL)
         elif self.state == GameState.LEVEL_SELECT:
             if key >= pygame.K_1 and key <= pygame.K_5:
                 level = key - pygame.K_0
                 if level <= self.current_level:  # Can only play unlocked levels
                     self.current_level = level
-                    self.load_level(level)
-                    self.state = GameState.PLAYING
+                    self.start_level(level)
             elif key == pygame.K_ESCAPE:
                 self.state = GameState.MENU
         elif self.state == GameState.PLAYING:
             if key == pygame.K_SPACE:
-                self.player_mushroom.jump()
+                self.input_source.press_jump()
             elif key == pygame.K_p:
                 self.state = GameState.PAUSED
             elif key == pygame.K_ESCAPE:
@@ -208,7 +403,7 @@ class Game:
             if key == pygame.K_p:
                 self.state = GameState.PLAYING
         elif self.state == GameState.LEVEL_COMPLETE:
-            if key == pygame.K_RETURN:
+            if key == pygame.K_RETURN and self.next_level_ready():
                 self.next_level()
         elif self.state == GameState.GAME_OVER:
             if key == pygame.K_RETURN:
@@ -219,6 +414,12 @@ class Game:
         if self.state != GameState.PLAYING:
             return
         
+        controls = self.input_source.poll()
+        if self.recorder:
+            self.recorder.record(controls)
+        if controls.jump:
+            self.player_mushroom.jump()
+        
         # Update timer
         self.timer += 1
         if self.timer >= 60:
@@ -229,96 +430,211 @@ class Game:
                 if self.lives <= 0:
                     self.state = GameState.GAME_OVER
                 else:
-                    self.load_level(self.current_level)
+                    self.load_level(self.loaded_level)
         
         # Update camera
-        self.update_camera()
+        profiler = self.profiler
+        with profiler.scope('update.world'):
+            self.update_camera()
+            if self.streamer and self.streamer.update(self.camera_x):
+                self.world_changed()
         
-        # Update objects
-        self.mario.update_ai(self.platforms, self.player_mushroom, self.enemies)
-        self.player_mushroom.update(self.platforms)
+        # Update objects; Mario and the player are always awake. AI and
+        # physics run interleaved per object, so each kind gets one scope
+        with profiler.scope('update.mario'):
+            self.mario.update_ai(self.platform_grid, self.player_mushroom, self.enemy_index)
+        with profiler.scope('update.player'):
+            self.player_mushroom.update(self.platform_grid, controls)
         
-        for mushroom in self.mushrooms:
-            if mushroom != self.player_mushroom:
-                mushroom.update(self.platforms, self.mario)
+        left, right = self.activation_bounds()
+        with profiler.scope('update.allies'):
+            if self.ally_batch is not None:
+                self.ally_batch.update(self.platform_grid, self.mario, left, right)
+            else:
+                for mushroom in self.mushrooms:
+                    if mushroom != self.player_mushroom and left < mushroom.rect.right and mushroom.rect.left < right:
+                        mushroom.update(self.platform_grid, self.mario)
         
-        for enemy in self.enemies:
-            enemy.update(self.platforms, self.player_mushroom, self.mario)
+        with profiler.scope('update.enemies'):
+            # Only awake enemies move, so only they can change index column
+            enemy_index = self.enemy_index
+            if self.enemy_batch is not None:
+                for enemy in self.enemy_batch.update(self.platform_grid, self.player_mushroom, self.mario,
+                                                     left, right):
+                    enemy_index.moved(enemy)
+            else:
+                for enemy in self.enemies:
+                    if left < enemy.rect.right and enemy.rect.left < right:
+                        enemy.update(self.platform_grid, self.player_mushroom, self.mario)
+                        enemy_index.moved(enemy)
         
-        for powerup in self.powerups:
-            powerup.update()
-        
-        for obstacle in self.obstacles:
-            obstacle.update()
+        with profiler.scope('update.items'):
+            for powerup in self.powerups:
+                if left < powerup.rect.right and powerup.rect.left < right:
+                    powerup.update()
+            
+            for obstacle in self.obstacles:
+                if left < obstacle.rect.right and obstacle.rect.left < right:
+                    obstacle.update()
+            
+            if self.player_mushroom.magnet_timer > 0:
+                self.apply_magnet()
         
         # Check collisions
-        self.check_collisions()
+        with profiler.scope('update.collisions'):
+            self.check_collisions()
+    
+    def apply_magnet(self):
+        """Pull power-ups within MAGNET_RADIUS of the player toward them.
+
+        Only power-ups the index finds within the radius on x are checked,
+        and only the pulled ones are moved in the index.
+        """
+        index = self.powerup_index
+        center_x, center_y = self.player_mushroom.rect.center
+        for powerup in index.within(center_x, MAGNET_RADIUS):
+            dx = powerup.rect.centerx - center_x
+            dy = powerup.rect.centery - center_y
+            if dx * dx + dy * dy < MAGNET_RADIUS * MAGNET_RADIUS:
+                powerup.pull_toward(center_x, center_y, MAGNET_SPEED)
+                index.moved(powerup)
+    
+    def activation_bounds(self):
+        """World x-range (left, right) in which entities are awake this frame.
+
+        The range depends only on the camera, so sleeping and waking happen
+        on the same frames in every replay of a run.
+        """
+        margin = self.active_margin * SCREEN_WIDTH
+        return self.camera_x - margin, self.camera_x + SCREEN_WIDTH + margin
     
     def update_camera(self):
         """Update camera"""
         target_x = self.player_mushroom.rect.centerx - SCREEN_WIDTH // 2
         self.camera_x += (target_x - self.camera_x) * 0.1
-        self.camera_x = max(0, min(self.camera_x, SCREEN_WIDTH * 2 - SCREEN_WIDTH))
+        self.camera_x = max(0, min(self.camera_x, self.world_width - SCREEN_WIDTH))
+    
+    def build_collision_targets(self):
+        """Gather the rects the collision stage tests, with a handler for each.
+
+        Rects are the sprites' own Rect objects, so the lists stay valid as
+        things move; they only need rebuilding when sprites are added or
+        removed.
+        """
+        self.mushroom_rects = [mushroom.rect for mushroom in self.mushrooms]
+        self.mushroom_list = list(self.mushrooms)
+        self.player_targets = ([(self.collect_powerup, powerup) for powerup in self.powerups]
+                               + [(self.hit_by_enemy, enemy) for enemy in self.enemies]
+                               + [(self.hit_by_obstacle, obstacle) for obstacle in self.obstacles])
+        self.player_target_rects = [sprite.rect for _, sprite in self.player_targets]
+        self.collision_target_counts = self.collision_group_counts()
+    
+    def collision_group_counts(self):
+        """Group sizes, used to notice sprites added or removed behind our back"""
+        return (len(self.mushrooms), len(self.powerups), len(self.enemies), len(self.obstacles))
     
     def check_collisions(self):
-        """Check all collisions"""
-        # Player vs Mario
-        for mushroom in self.mushrooms:
-            if mushroom.rect.colliderect(self.mario.rect):
-                if mushroom.rect.bottom <= self.mario.rect.top + 15 and mushroom.vel_y >= 0:
-                    mushroom.on_mario = True
-                    mushroom.vel_y = 0
-                    mushroom.rect.bottom = self.mario.rect.top
-                    if mushroom == self.player_mushroom:
-                        self.score += 100
-                        self.check_level_complete()
-        
-        # Player vs Power-ups
-        for powerup in self.powerups:
-            if powerup.rect.colliderect(self.player_mushroom.rect):
-                self.player_mushroom.apply_powerup(powerup.type)
-                powerup.kill()
-                self.score += 50
-        
-        # Player vs Enemies
-        for enemy in self.enemies:
-            if enemy.rect.colliderect(self.player_mushroom.rect):
-                if self.player_mushroom.take_damage(enemy.damage):
-                    print(f"Player hit by {enemy.enemy_type}! Health: {self.player_mushroom.health}")
-                    if self.player_mushroom.health <= 0:
-                        self.lives -= 1
-                        if self.lives <= 0:
-                            self.state = GameState.GAME_OVER
-                        else:
-                            self.load_level(self.current_level)
-        
-        # Player vs Obstacles
-        for obstacle in self.obstacles:
-            if obstacle.rect.colliderect(self.player_mushroom.rect):
-                if self.player_mushroom.take_damage(obstacle.damage):
-                    print(f"Player hit obstacle! Health: {self.player_mushroom.health}")
-                    if self.player_mushroom.health <= 0:
-                        self.lives -= 1
-                        if self.lives <= 0:
-                            self.state = GameState.GAME_OVER
-                        else:
-                            self.load_level(self.current_level)
+        """Check all collisions.
+
+        Broad phase: pygame's C-level Rect.collidelistall finds every
+        overlapping pair against Mario and against the player in one call
+        each. Narrow phase: the pairs are dispatched, in the original
+        mushrooms, power-ups, enemies, obstacles order, to their handlers.
+        """
+        if self.collision_target_counts != self.collision_group_counts():
+            self.build_collision_targets()
+        
+        # Mushrooms vs Mario
+        mario_rect = self.mario.rect
+        for index in mario_rect.collidelistall(self.mushroom_rects):
+            mushroom = self.mushroom_list[index]
+            if mushroom.rect.bottom <= mario_rect.top + 15 and mushroom.vel_y >= 0:
+                mushroom.on_mario = True
+                mushroom.vel_y = 0
+                mushroom.rect.bottom = mario_rect.top
+                if mushroom == self.player_mushroom:
+                    self.score += 100
+                    self.check_level_complete()
+        
+        # Player vs power-ups, enemies and obstacles
+        for index in self.player_mushroom.rect.collidelistall(self.player_target_rects):
+            handler, sprite = self.player_targets[index]
+            if handler(sprite):
+                # The player died; the remaining pairs belong to the old level
+                break
+    
+    def collect_powerup(self, powerup):
+        """Player touched a power-up"""
+        self.player_mushroom.apply_powerup(powerup.type)
+        self.powerups.remove(powerup)
+        self.powerup_index.discard(powerup)
+        if self.streamer:
+            self.streamer.collected(powerup)
+        self.score += 50
+        return False
+    
+    def hit_by_enemy(self, enemy):
+        """Player touched an enemy; returns True if the player died"""
+        if self.player_mushroom.take_damage(enemy.damage):
+            self.log(f"Player hit by {enemy.enemy_type}! Health: {self.player_mushroom.health}")
+            return self.check_player_death()
+        return False
+    
+    def hit_by_obstacle(self, obstacle):
+        """Player touched an obstacle; returns True if the player died"""
+        if self.player_mushroom.take_damage(obstacle.damage):
+            self.log(f"Player hit obstacle! Health: {self.player_mushroom.health}")
+            return self.check_player_death()
+        return False
+    
+    def check_player_death(self):
+        """Lose a life and restart or end the game if the player is out of health"""
+        if self.player_mushroom.health > 0:
+            return False
+        self.lives -= 1
+        if self.lives <= 0:
+            self.state = GameState.GAME_OVER
+        else:
+            self.load_level(self.loaded_level)
+        return True
     
     def check_level_complete(self):
         """Check level completion"""
-        if self.player_mushroom.on_mario:
+        if self.player_mushroom.on_mario and self.loaded_level == ENDLESS_LEVEL:
+            # Endless mode never completes: catching Mario refills the
+            # clock and sends him off ahead again
+            self.time_left = 120
+            self.player_mushroom.on_mario = False
+            self.player_mushroom.vel_y = JUMP_SPEED
+            self.mario.rect.x = self.player_mushroom.rect.x + SCREEN_WIDTH
+        elif self.player_mushroom.on_mario:
             self.state = GameState.LEVEL_COMPLETE
             self.score += self.time_left * 10
             # Unlock next level
             if self.current_level < self.max_level:
                 self.current_level = max(self.current_level, self.current_level + 1)
+            # Build the next level while the completion screen is shown
+            upcoming = self.upcoming_level()
+            if upcoming is not None and (self.seed, upcoming) not in self.compiled_levels:
+                self.level_loader.prefetch(upcoming)
+    
+    def upcoming_level(self):
+        """The level next_level() will start, or None if it returns to the menu"""
+        if self.current_level < self.max_level:
+            return self.current_level + 1
+        return None
+    
+    def next_level_ready(self):
+        """True once next_level() can run without waiting for the level build"""
+        upcoming = self.upcoming_level()
+        return upcoming is None or self.level_loader.ready(upcoming)
     
     def next_level(self):
         """Next level"""
-        if self.current_level < self.max_level:
-            self.current_level += 1
-            self.load_level(self.current_level)
-            self.state = GameState.PLAYING
+        upcoming = self.upcoming_level()
+        if upcoming is not None:
+            self.current_level = upcoming
+            self.start_level(self.current_level)
         else:
             self.state = GameState.MENU
     
@@ -328,8 +644,7 @@ class Game:
         pass
     
     def restart_game(self):
-        """Restart game"""
+        """Restart game from the level that was lost, endless mode included"""
         self.lives = 3
         self.player_mushroom.health = self.player_mushroom.max_health
-        self.load_level(self.current_level)
-        self.state = GameState.PLAYING
\ No newline at end of file
+        self.start_level(self.loaded_level)
\ No newline at end of file
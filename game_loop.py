@@ -0,0 +1,113 @@
+import time
+
+# Simulation rate the physics constants in game_objects are tuned for
+STEPS_PER_SECOND = 60
+
+class Interpolator:
+    """Draws moving sprites between their last two simulation positions.
+
+    snapshot() records positions before a step; draw() temporarily moves
+    sprites and the camera alpha of the way from the snapshot to the current
+    state, draws, and puts everything back so the simulation never sees it.
+    """
+    
+    # Moves larger than this between steps are teleports (wrapping, respawn)
+    MAX_BLEND_DISTANCE = 100
+    
+    def __init__(self, draw):
+        self.draw_frame = draw
+        self.previous = {}
+        self.previous_camera_x = None
+    
+    def moving_sprites(self, game):
+        """Sprites whose positions change between steps"""
+        if not hasattr(game, 'mario'):
+            return []
+        return [game.mario, *game.mushrooms, *game.enemies, *game.powerups]
+    
+    def snapshot(self, game):
+        """Remember positions before a simulation step"""
+        self.previous = {sprite: sprite.rect.topleft for sprite in self.moving_sprites(game)}
+        self.previous_camera_x = game.camera_x
+    
+    def draw(self, game, alpha):
+        """Draw the frame alpha of the way between the last two steps"""
+        current = {}
+        for sprite, (prev_x, prev_y) in self.previous.items():
+            x, y = sprite.rect.topleft
+            if abs(x - prev_x) <= self.MAX_BLEND_DISTANCE and abs(y - prev_y) <= self.MAX_BLEND_DISTANCE:
+                current[sprite] = (x, y)
+                sprite.rect.topleft = (prev_x + (x - prev_x) * alpha, prev_y + (y - prev_y) * alpha)
+        camera_x = game.camera_x
+        if self.previous_camera_x is not None:
+            game.camera_x = self.previous_camera_x + (camera_x - self.previous_camera_x) * alpha
+        try:
+            self.draw_frame(game)
+        finally:
+            for sprite, position in current.items():
+                sprite.rect.topleft = position
+            game.camera_x = camera_x
+
+class FixedTimestepLoop:
+    """Accumulator game loop that decouples simulation from rendering.
+
+    Game.update always advances exactly one fixed step. Each rendered frame
+    runs as many steps as the elapsed real time calls for (several when
+    rendering is slow, none when it is fast), so gameplay speed does not
+    depend on frame rate. At most max_steps run per frame; beyond that the
+    backlog is dropped rather than letting a slow machine spiral.
+    """
+    
+    def __init__(self, game, draw, steps_per_second=STEPS_PER_SECOND, max_steps=5,
+                 max_fps=None, interpolate=False, clock=time.perf_counter):
+        self.game = game
+        self.step_time = 1 / steps_per_second
+        self.max_steps = max_steps
+        self.max_fps = max_fps
+        self.clock = clock
+        self.interpolator = Interpolator(draw) if interpolate else None
+        self.draw = draw
+        self.accumulator = 0.0
+        self.last_time = None
+    
+    def tick(self):
+        """Handle events, run the due simulation steps and render one frame.
+
+        Returns the number of steps run.
+        """
+        now = self.clock()
+        if self.last_time is None:
+            self.last_time = now - self.step_time
+        self.accumulator += min(now - self.last_time, self.max_steps * self.step_time)
+        self.last_time = now
+        profiler = self.game.profiler
+        profiler.begin_frame()
+        
+        with profiler.scope('events'):
+            self.game.handle_events()
+        steps = 0
+        while self.accumulator >= self.step_time and steps < self.max_steps:
+            if self.interpolator:
+                self.interpolator.snapshot(self.game)
+            with profiler.scope('update'):
+                self.game.update()
+            self.accumulator -= self.step_time
+            steps += 1
+        if steps == self.max_steps:
+            # Too far behind to catch up: drop the backlog
+            self.accumulator = min(self.accumulator, self.step_time)
+        
+        with profiler.scope('draw'):
+            if self.interpolator:
+                self.interpolator.draw(self.game, self.accumulator / self.step_time)
+            else:
+                self.draw(self.game)
+        profiler.end_frame()
+        return steps
+    
+    def run(self):
+        """Run until the game stops"""
+        while self.game.running:
+            self.tick()
+            if self.max_fps:
+                self.game.clock.tick(self.max_fps)
@@ -1,14 +1,25 @@
+import math
 import pygame
 import random
-import math
+import weakref
+from collections import namedtuple
 from enum import Enum
 
+# Screen constants
+SCREEN_WIDTH = 1400
+SCREEN_HEIGHT = 900
+GROUND_HEIGHT = 50  # Thickness of the floor along the bottom of the screen
+GROUND_Y = SCREEN_HEIGHT - GROUND_HEIGHT  # Nothing falls below this line
+
 # Constants
 GRAVITY = 0.8
 JUMP_SPEED = -16
 MARIO_SPEED = 4
 MUSHROOM_SPEED = 3
 ENEMY_SPEED = 2
+MAGNET_RADIUS = 250
+WORLD_WIDTH = SCREEN_WIDTH * 2  # Width of the five fixed levels; endless levels pass their own
+MAGNET_SPEED = 6
 
 # Colors
 WHITE = (255, 255, 255)
@@ -24,6 +35,30 @@ GRAY = (128, 128, 128)
 DARK_RED = (139, 0, 0)
 PINK = (255, 192, 203)
 
+# Translucent overlays for flash effects
+FLASH_WHITE = (255, 255, 255, 128)
+FLASH_RED = (255, 0, 0, 128)
+
+_tint_cache = weakref.WeakKeyDictionary()
+
+def tinted_image(image, color):
+    """Return image with a translucent color laid over it.
+
+    Each tint is built once per source image and then reused, so flashing
+    sprites only swap references; tints are dropped with their source image.
+    """
+    tints = _tint_cache.get(image)
+    if tints is None:
+        tints = _tint_cache[image] = {}
+    tinted = tints.get(color)
+    if tinted is None:
+        tinted = image.copy()
+        overlay = pygame.Surface(image.get_size(), pygame.SRCALPHA)
+        overlay.fill(color)
+        tinted.blit(overlay, (0, 0))
+        tints[color] = tinted
+    return tinted
+
 class PowerUpType(Enum):
     SPEED_BOOST = 1
     SUPER_JUMP = 2
@@ -36,10 +71,58 @@ class EnemyType(Enum):
     POISON_MUSHROOM = 3
     FIRE_MUSHROOM = 4
 
+# Per-type enemy stats
+ENEMY_DAMAGE = {
+    EnemyType.EVIL_MUSHROOM: 15,
+    EnemyType.SPIKY_MUSHROOM: 25,
+    EnemyType.POISON_MUSHROOM: 20,
+    EnemyType.FIRE_MUSHROOM: 30
+}
+ENEMY_HEALTH = {
+    EnemyType.EVIL_MUSHROOM: 30,
+    EnemyType.SPIKY_MUSHROOM: 50,
+    EnemyType.POISON_MUSHROOM: 40,
+    EnemyType.FIRE_MUSHROOM: 60
+}
+
+PATROL_VELOCITIES = (-ENEMY_SPEED, ENEMY_SPEED)
+
+# Mario's AI parameters for one level. flee_speed and jump_threshold are
+# (calm, threatened) pairs indexed by whether an enemy is close.
+MarioAI = namedtuple('MarioAI', ['speed', 'detection_range', 'flee_speed', 'jump_threshold',
+                                 'wander_interval', 'wander_choices', 'wraps'])
+
+_mario_ai_tables = {}
+
+def mario_ai_params(level):
+    """Return Mario's AI parameters for a level, computing them once per level"""
+    params = _mario_ai_tables.get(level)
+    if params is None:
+        speed = MARIO_SPEED * (1 + (level - 1) * 0.3)
+        choices = (-speed, 0, speed)
+        if level >= 3:  # Add standing still less often on higher levels
+            choices += (speed, -speed)
+        params = MarioAI(speed=speed,
+                         detection_range=180 + (level - 1) * 60,
+                         flee_speed=(speed * 1.5, speed * 2.0),
+                         jump_threshold=(80, 60),
+                         wander_interval=70 - level * 8,
+                         wander_choices=choices,
+                         wraps=level >= 4)  # Screen wrapping on higher levels
+        _mario_ai_tables[level] = params
+    return params
+
 class Mario(pygame.sprite.Sprite):
-    def __init__(self, x, y, image, level):
+    # Attributes that change during play, saved and restored on respawn (see level_loader)
+    STATE_ATTRIBUTES = ('image', 'rect', 'vel_y', 'vel_x', 'on_ground', 'direction', 'ai_timer', 'jump_cooldown',
+                        'health', 'invulnerable_timer')
+    
+    def __init__(self, x, y, image, level, rng=random, world_width=WORLD_WIDTH):
         super().__init__()
+        self.rng = rng
+        self.world_width = world_width
         self.image = image
+        self.original_image = image
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
@@ -50,55 +133,53 @@ class Mario(pygame.sprite.Sprite):
         self.ai_timer = 0
         self.jump_cooldown = 0
         self.level = level
+        self.ai = mario_ai_params(level)
         self.max_health = 100
         self.health = 100
         self.invulnerable_timer = 0
     
     def update_ai(self, platforms, player_mushroom, enemies=None):
-        """Enhanced Mario AI with enemy awareness"""
+        """Enhanced Mario AI with enemy awareness.
+
+        enemies is a ProximityIndex over the enemy mushrooms.
+        """
         if self.invulnerable_timer > 0:
             self.invulnerable_timer -= 1
+        # Red flash while recovering from damage
+        if self.invulnerable_timer > 0:
+            self.image = tinted_image(self.original_image, FLASH_RED)
+        else:
+            self.image = self.original_image
         
         self.jump_cooldown = max(0, self.jump_cooldown - 1)
         self.ai_timer += 1
         
         # Enhanced behavior based on level
-        speed_multiplier = 1 + (self.level - 1) * 0.3
-        detection_range = 180 + (self.level - 1) * 60
+        ai = self.ai
         
         distance_to_player = player_mushroom.rect.centerx - self.rect.centerx
         
         # Check for nearby enemies and avoid them too
-        enemy_threat = False
-        if enemies:
-            for enemy in enemies:
-                enemy_distance = abs(enemy.rect.centerx - self.rect.centerx)
-                if enemy_distance < 100:
-                    enemy_threat = True
-                    break
-        
-        if abs(distance_to_player) < detection_range or enemy_threat:
+        enemy_threat = enemies is not None and enemies.any_within(self.rect.centerx, 100)
+        
+        if abs(distance_to_player) < ai.detection_range or enemy_threat:
             # Enhanced panic behavior
-            panic_multiplier = 2.0 if enemy_threat else 1.5
+            flee_speed = ai.flee_speed[enemy_threat]
             if distance_to_player > 0:
-                self.vel_x = -MARIO_SPEED * speed_multiplier * panic_multiplier
+                self.vel_x = -flee_speed
                 self.direction = -1
             else:
-                self.vel_x = MARIO_SPEED * speed_multiplier * panic_multiplier
+                self.vel_x = flee_speed
                 self.direction = 1
             
             # More frequent jumping when threatened
-            jump_threshold = 60 if enemy_threat else 80
-            if abs(distance_to_player) < jump_threshold and self.on_ground and self.jump_cooldown == 0:
+            if abs(distance_to_player) < ai.jump_threshold[enemy_threat] and self.on_ground and self.jump_cooldown == 0:
                 self.jump()
                 self.jump_cooldown = 30
         else:
             # Normal movement with more variation
-            if self.ai_timer % (70 - self.level * 8) == 0:
-                choices = [-MARIO_SPEED * speed_multiplier, 0, MARIO_SPEED * speed_multiplier]
-                if self.level >= 3:  # Add standing still less often on higher levels
-                    choices.extend([MARIO_SPEED * speed_multiplier, -MARIO_SPEED * speed_multiplier])
-                self.vel_x = random.choice(choices)
+            if self.ai_timer % ai.wander_interval == 0:
+                self.vel_x = self.rng.choice(ai.wander_choices)
                 if self.vel_x > 0:
                     self.direction = 1
                 elif self.vel_x < 0:
@@ -108,20 +189,20 @@ class Mario(pygame.sprite.Sprite):
         self.rect.x += self.vel_x
         
         # Enhanced boundary checking with screen wrapping on higher levels
-        screen_width = 1400 * 2  # Extended world width
+        screen_width = self.world_width  # Extended world width
         if self.rect.x < 0:
-            if self.level >= 4:  # Screen wrapping on higher levels
+            if ai.wraps:
                 self.rect.x = screen_width - self.rect.width
             else:
                 self.rect.x = 0
-                self.vel_x = MARIO_SPEED * speed_multiplier
+                self.vel_x = ai.speed
                 self.direction = 1
         elif self.rect.right > screen_width:
-            if self.level >= 4:
+            if ai.wraps:
                 self.rect.x = 0
             else:
                 self.rect.right = screen_width
-                self.vel_x = -MARIO_SPEED * speed_multiplier
+                self.vel_x = -ai.speed
                 self.direction = -1
         
         # Physics
@@ -129,15 +210,15 @@ class Mario(pygame.sprite.Sprite):
         self.rect.y += self.vel_y
         
         # Ground collision - prevent falling through floor
-        if self.rect.bottom >= 900 - 50:  # SCREEN_HEIGHT - ground_height
-            self.rect.bottom = 900 - 50
+        if self.rect.bottom >= GROUND_Y:
+            self.rect.bottom = GROUND_Y
             self.vel_y = 0
             self.on_ground = True
         else:
             self.on_ground = False
         
         # Platform collisions
-        for platform in platforms:
+        for platform in platforms.query(self.rect):
             if self.rect.colliderect(platform.rect):
                 if self.vel_y > 0:
                     self.rect.bottom = platform.rect.top
@@ -162,8 +243,13 @@ class Mario(pygame.sprite.Sprite):
 
 
 class PlayerMushroom(pygame.sprite.Sprite):
-    def __init__(self, x, y, image):
+    STATE_ATTRIBUTES = ('image', 'rect', 'vel_y', 'on_ground', 'on_mario', 'health', 'invulnerable_timer',
+                        'speed_boost_timer', 'super_jump_timer', 'invincibility_timer', 'magnet_timer',
+                        'damage_flash_timer')
+    
+    def __init__(self, x, y, image, world_width=WORLD_WIDTH):
         super().__init__()
+        self.world_width = world_width
         self.image = image
         self.original_image = image
         self.rect = self.image.get_rect()
@@ -185,14 +271,13 @@ class PlayerMushroom(pygame.sprite.Sprite):
         # Visual effects
         self.damage_flash_timer = 0
     
-    def update(self, platforms):
-        """Update player mushroom"""
+    def update(self, platforms, controls):
+        """Update player mushroom from an InputState"""
         # Update timers
         self.invulnerable_timer = max(0, self.invulnerable_timer - 1)
         self.damage_flash_timer = max(0, self.damage_flash_timer - 1)
         
         # Controls
-        keys = pygame.key.get_pressed()
         base_speed = MUSHROOM_SPEED * 1.5
         
         # Speed boost
@@ -200,17 +285,17 @@ class PlayerMushroom(pygame.sprite.Sprite):
             base_speed *= 2
             self.speed_boost_timer -= 1
         
-        if keys[pygame.K_LEFT] or keys[pygame.K_a]:
+        if controls.left:
             self.rect.x -= base_speed
-        if keys[pygame.K_RIGHT] or keys[pygame.K_d]:
+        if controls.right:
             self.rect.x += base_speed
         
         # Boundaries
-        screen_width = 1400 * 2
+        screen_width = self.world_width
         self.rect.x = max(0, min(self.rect.x, screen_width - self.rect.width))
         
         # Jump off Mario
-        if self.on_mario and (keys[pygame.K_LEFT] or keys[pygame.K_RIGHT] or keys[pygame.K_a] or keys[pygame.K_d]):
+        if self.on_mario and (controls.left or controls.right):
             self.on_mario = False
             self.vel_y = JUMP_SPEED * 0.5
         
@@ -220,15 +305,15 @@ class PlayerMushroom(pygame.sprite.Sprite):
             self.rect.y += self.vel_y
             
             # Ground collision - prevent falling through floor
-            if self.rect.bottom >= 900 - 50:  # SCREEN_HEIGHT - ground_height
-                self.rect.bottom = 900 - 50
+            if self.rect.bottom >= GROUND_Y:
+                self.rect.bottom = GROUND_Y
                 self.vel_y = 0
                 self.on_ground = True
             else:
                 self.on_ground = False
             
             # Platform collisions
-            for platform in platforms:
+            for platform in platforms.query(self.rect):
                 if self.rect.colliderect(platform.rect):
                     if self.vel_y > 0:  # Falling down
                         self.rect.bottom = platform.rect.top
@@ -247,18 +332,12 @@ class PlayerMushroom(pygame.sprite.Sprite):
         if self.invincibility_timer > 0:
             # Make the sprite flash
             if (self.invincibility_timer // 5) % 2:
-                self.image = self.original_image.copy()
-                overlay = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-                overlay.fill((255, 255, 255, 128))
-                self.image.blit(overlay, (0, 0))
+                self.image = tinted_image(self.original_image, FLASH_WHITE)
             else:
                 self.image = self.original_image
         elif self.damage_flash_timer > 0:
             # Red flash when taking damage
-            self.image = self.original_image.copy()
-            overlay = pygame.Surface(self.image.get_size(), pygame.SRCALPHA)
-            overlay.fill((255, 0, 0, 128))
-            self.image.blit(overlay, (0, 0))
+            self.image = tinted_image(self.original_image, FLASH_RED)
         else:
             self.image = self.original_image
     
@@ -293,47 +372,34 @@ class PlayerMushroom(pygame.sprite.Sprite):
 
 
 class EnemyMushroom(pygame.sprite.Sprite):
-    def __init__(self, x, y, enemy_type, image):
+    STATE_ATTRIBUTES = ('rect', 'vel_y', 'vel_x', 'on_ground', 'ai_timer', 'attack_cooldown', 'health',
+                        'special_timer')
+    
+    def __init__(self, x, y, enemy_type, image, rng=random, world_width=WORLD_WIDTH):
         super().__init__()
+        self.rng = rng
+        self.world_width = world_width
         self.enemy_type = enemy_type
         self.image = image
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
         self.vel_y = 0
-        self.vel_x = random.choice([-ENEMY_SPEED, ENEMY_SPEED])
+        self.vel_x = rng.choice([-ENEMY_SPEED, ENEMY_SPEED])
         self.on_ground = False
         self.ai_timer = 0
         self.attack_cooldown = 0
-        self.damage = self._get_damage()
-        self.health = self._get_health()
+        self.damage = ENEMY_DAMAGE.get(enemy_type, 15)
+        self.health = ENEMY_HEALTH.get(enemy_type, 30)
         self.max_health = self.health
+        self._ai = AI_BEHAVIORS[enemy_type]
+        self.ai_rule = ENEMY_AI_RULES[enemy_type]
         
         # Special abilities based on type
         self.special_timer = 0
         self.patrol_start_x = x
         self.patrol_range = 200
     
-    def _get_damage(self):
-        """Get damage based on enemy type"""
-        damage_map = {
-            EnemyType.EVIL_MUSHROOM: 15,
-            EnemyType.SPIKY_MUSHROOM: 25,
-            EnemyType.POISON_MUSHROOM: 20,
-            EnemyType.FIRE_MUSHROOM: 30
-        }
-        return damage_map.get(self.enemy_type, 15)
-    
-    def _get_health(self):
-        """Get health based on enemy type"""
-        health_map = {
-            EnemyType.EVIL_MUSHROOM: 30,
-            EnemyType.SPIKY_MUSHROOM: 50,
-            EnemyType.POISON_MUSHROOM: 40,
-            EnemyType.FIRE_MUSHROOM: 60
-        }
-        return health_map.get(self.enemy_type, 30)
-    
     def update(self, platforms, player_mushroom, mario=None):
         """Update enemy mushroom"""
         self.ai_timer += 1
@@ -341,29 +407,22 @@ class EnemyMushroom(pygame.sprite.Sprite):
         self.special_timer += 1
         
         # AI behavior based on type
-        if self.enemy_type == EnemyType.EVIL_MUSHROOM:
-            self._evil_mushroom_ai(player_mushroom, mario)
-        elif self.enemy_type == EnemyType.SPIKY_MUSHROOM:
-            self._spiky_mushroom_ai(player_mushroom)
-        elif self.enemy_type == EnemyType.POISON_MUSHROOM:
-            self._poison_mushroom_ai(player_mushroom)
-        elif self.enemy_type == EnemyType.FIRE_MUSHROOM:
-            self._fire_mushroom_ai(player_mushroom)
+        self._ai(self, player_mushroom, mario)
         
         # Physics
         self.vel_y += GRAVITY
         self.rect.y += self.vel_y
         
         # Ground collision - prevent falling through floor
-        if self.rect.bottom >= 900 - 50:  # SCREEN_HEIGHT - ground_height
-            self.rect.bottom = 900 - 50
+        if self.rect.bottom >= GROUND_Y:
+            self.rect.bottom = GROUND_Y
             self.vel_y = 0
             self.on_ground = True
         else:
             self.on_ground = False
         
         # Platform collisions
-        for platform in platforms:
+        for platform in platforms.query(self.rect):
             if self.rect.colliderect(platform.rect):
                 if self.vel_y > 0:
                     self.rect.bottom = platform.rect.top
@@ -374,78 +433,51 @@ class EnemyMushroom(pygame.sprite.Sprite):
                     self.vel_y = 0
         
         # Screen boundaries
-        screen_width = 1400 * 2
+        screen_width = self.world_width
         if self.rect.x < 0 or self.rect.right > screen_width:
             self.vel_x = -self.vel_x
     
-    def _evil_mushroom_ai(self, player_mushroom, mario):
-        """Basic evil mushroom - chases player"""
-        distance_to_player = player_mushroom.rect.centerx - self.rect.centerx
-        
-        if abs(distance_to_player) < 300:
-            # Chase player
-            if distance_to_player > 0:
-                self.vel_x = ENEMY_SPEED * 1.2
-            else:
-                self.vel_x = -ENEMY_SPEED * 1.2
-                
-            # Jump towards player
-            if abs(distance_to_player) < 100 and self.on_ground and player_mushroom.rect.y < self.rect.y:
-                self.vel_y = JUMP_SPEED * 0.8
+    def _chase(self, distance_to_player):
+        """Head for the player at the type's chase speed"""
+        if distance_to_player > 0:
+            self.vel_x = self.ai_rule.chase_speed
         else:
-            # Patrol behavior
-            self._patrol_behavior()
-        
-        self.rect.x += self.vel_x
+            self.vel_x = -self.ai_rule.chase_speed
     
-    def _spiky_mushroom_ai(self, player_mushroom):
-        """Spiky mushroom - jumps frequently and is aggressive"""
+    def _jump_at_player_ai(self, player_mushroom, mario=None):
+        """Chase the player and jump at them when close and below them"""
+        rule = self.ai_rule
         distance_to_player = player_mushroom.rect.centerx - self.rect.centerx
         
-        if abs(distance_to_player) < 250:
-            # Aggressive chase
-            if distance_to_player > 0:
-                self.vel_x = ENEMY_SPEED * 1.5
-            else:
-                self.vel_x = -ENEMY_SPEED * 1.5
-            
-            # Frequent jumping
-            if self.on_ground and self.ai_timer % 60 == 0:
-                self.vel_y = JUMP_SPEED * 1.1
+        if abs(distance_to_player) < rule.chase_range:
+            self._chase(distance_to_player)
+            if abs(distance_to_player) < rule.jump_range and self.on_ground and player_mushroom.rect.y < self.rect.y:
+                self.vel_y = rule.jump_speed
         else:
             self._patrol_behavior()
         
         self.rect.x += self.vel_x
     
-    def _poison_mushroom_ai(self, player_mushroom):
-        """Poison mushroom - slower but more persistent"""
+    def _hopping_ai(self, player_mushroom, mario=None):
+        """Chase the player, jumping every jump_period frames on the ground"""
+        rule = self.ai_rule
         distance_to_player = player_mushroom.rect.centerx - self.rect.centerx
         
-        if abs(distance_to_player) < 400:  # Larger detection range
-            # Slow but persistent chase
-            if distance_to_player > 0:
-                self.vel_x = ENEMY_SPEED * 0.8
-            else:
-                self.vel_x = -ENEMY_SPEED * 0.8
+        if abs(distance_to_player) < rule.chase_range:
+            self._chase(distance_to_player)
+            if self.on_ground and self.ai_timer % rule.jump_period == 0:
+                self.vel_y = rule.jump_speed
         else:
             self._patrol_behavior()
         
         self.rect.x += self.vel_x
     
-    def _fire_mushroom_ai(self, player_mushroom):
-        """Fire mushroom - fast and jumps high"""
+    def _chase_ai(self, player_mushroom, mario=None):
+        """Chase the player without jumping"""
         distance_to_player = player_mushroom.rect.centerx - self.rect.centerx
         
-        if abs(distance_to_player) < 200:
-            # Fast aggressive movement
-            if distance_to_player > 0:
-                self.vel_x = ENEMY_SPEED * 2.0
-            else:
-                self.vel_x = -ENEMY_SPEED * 2.0
-            
-            # High jumping
-            if abs(distance_to_player) < 120 and self.on_ground and player_mushroom.rect.y < self.rect.y:
-                self.vel_y = JUMP_SPEED * 1.3
+        if abs(distance_to_player) < self.ai_rule.chase_range:
+            self._chase(distance_to_player)
         else:
             self._patrol_behavior()
         
@@ -457,20 +489,46 @@ class EnemyMushroom(pygame.sprite.Sprite):
         if abs(self.rect.x - self.patrol_start_x) > self.patrol_range:
             self.vel_x = -self.vel_x
         elif self.ai_timer % 120 == 0:  # Change direction occasionally
-            self.vel_x = random.choice([-ENEMY_SPEED, ENEMY_SPEED])
+            self.vel_x = self.rng.choice(PATROL_VELOCITIES)
         
         self.rect.x += self.vel_x
 
 
+# Per-type chase rules, shared by the sprite AI above and the batched one in
+# entity_batch. A jump range means "jump at the player when close, on the
+# ground and below them"; a jump period means "jump every N frames while
+# chasing and on the ground".
+EnemyAIRule = namedtuple('EnemyAIRule', ['chase_range', 'chase_speed', 'jump_range', 'jump_speed', 'jump_period'])
+
+ENEMY_AI_RULES = {
+    EnemyType.EVIL_MUSHROOM: EnemyAIRule(300, ENEMY_SPEED * 1.2, 100, JUMP_SPEED * 0.8, 0),
+    EnemyType.SPIKY_MUSHROOM: EnemyAIRule(250, ENEMY_SPEED * 1.5, 0, JUMP_SPEED * 1.1, 60),
+    EnemyType.POISON_MUSHROOM: EnemyAIRule(400, ENEMY_SPEED * 0.8, 0, 0, 0),
+    EnemyType.FIRE_MUSHROOM: EnemyAIRule(200, ENEMY_SPEED * 2.0, 120, JUMP_SPEED * 1.3, 0),
+}
+
+# EnemyMushroom AI function per enemy type, looked up once per enemy
+AI_BEHAVIORS = {
+    EnemyType.EVIL_MUSHROOM: EnemyMushroom._jump_at_player_ai,
+    EnemyType.SPIKY_MUSHROOM: EnemyMushroom._hopping_ai,
+    EnemyType.POISON_MUSHROOM: EnemyMushroom._chase_ai,
+    EnemyType.FIRE_MUSHROOM: EnemyMushroom._jump_at_player_ai,
+}
+
+
 class Mushroom(pygame.sprite.Sprite):
-    def __init__(self, x, y, image):
+    STATE_ATTRIBUTES = ('rect', 'vel_y', 'vel_x', 'on_ground', 'on_mario', 'jump_cooldown')
+    
+    def __init__(self, x, y, image, rng=random, world_width=WORLD_WIDTH):
         super().__init__()
+        self.rng = rng
+        self.world_width = world_width
         self.image = image
         self.rect = self.image.get_rect()
         self.rect.x = x
         self.rect.y = y
         self.vel_y = 0
-        self.vel_x = random.choice([-MUSHROOM_SPEED, MUSHROOM_SPEED])
+        self.vel_x = rng.choice([-MUSHROOM_SPEED, MUSHROOM_SPEED])
         self.on_ground = False
         self.on_mario = False
         self.jump_cooldown = 0
@@ -482,10 +540,10 @@ class Mushroom(pygame.sprite.Sprite):
         if self.on_mario:
             self.rect.centerx = mario.rect.centerx
             self.rect.bottom = mario.rect.top
-            if random.randint(1, 240) == 1:
+            if self.rng.randint(1, 240) == 1:
                 self.on_mario = False
                 self.vel_y = JUMP_SPEED
-                self.vel_x = random.choice([-MUSHROOM_SPEED * 2, MUSHROOM_SPEED * 2])
+                self.vel_x = self.rng.choice([-MUSHROOM_SPEED * 2, MUSHROOM_SPEED * 2])
             return
         
         # AI movement towards Mario
@@ -505,15 +563,15 @@ class Mushroom(pygame.sprite.Sprite):
         self.rect.y += self.vel_y
         
         # Ground collision - prevent falling through floor
-        if self.rect.bottom >= 900 - 50:  # SCREEN_HEIGHT - ground_height
-            self.rect.bottom = 900 - 50
+        if self.rect.bottom >= GROUND_Y:
+            self.rect.bottom = GROUND_Y
             self.vel_y = 0
             self.on_ground = True
         else:
             self.on_ground = False
         
         # Platform collisions
-        for platform in platforms:
+        for platform in platforms.query(self.rect):
             if self.rect.colliderect(platform.rect):
                 if self.vel_y > 0:
                     self.rect.bottom = platform.rect.top
@@ -524,7 +582,7 @@ class Mushroom(pygame.sprite.Sprite):
                     self.vel_y = 0
         
         # Screen boundaries
-        screen_width = 1400 * 2
+        screen_width = self.world_width
         if self.rect.x < 0 or self.rect.right > screen_width:
             self.vel_x = -self.vel_x
     
@@ -534,16 +592,170 @@ class Mushroom(pygame.sprite.Sprite):
             self.vel_y = JUMP_SPEED * 1.2
 
 
-class Platform(pygame.sprite.Sprite):
+# Static level geometry and pickups are plain slotted objects rather than
+# pygame sprites: they are never drawn through sprite groups, and a level can
+# hold thousands of them, so they skip the per-instance __dict__ and group
+# bookkeeping and are kept in ordinary lists.
+
+class Platform:
+    __slots__ = ('rect', 'platform_type')
+    
     def __init__(self, x, y, width, height, platform_type='normal'):
-        super().__init__()
         self.rect = pygame.Rect(x, y, width, height)
         self.platform_type = platform_type
 
 
-class PowerUp(pygame.sprite.Sprite):
+class PlatformGrid:
+    """Static uniform grid over level platforms for collision queries.
+
+    Platforms only ever push entities vertically, so the set of platforms an
+    entity can touch during one collision pass is fixed by its x range. The
+    grid therefore buckets platforms into fixed-width columns, and a query
+    returns the platforms of every column the rect overlaps, in the same
+    order as the source group so collision resolution is unchanged.
+
+    The list for each run of columns is merged once and cached, so a query
+    is a dictionary lookup and allocates nothing. The lists are shared:
+    callers must not modify them.
+
+    Any static objects with a rect can be gridded, and overlapping() serves
+    draw culling as well: game_ui culls platforms through the game's grid
+    and obstacles through a grid of their own.
+    """
+
+    def __init__(self, platforms, cell_width=200):
+        self.cell_width = cell_width
+        self.platforms = list(platforms)
+        self.cells = {}
+        for index, platform in enumerate(self.platforms):
+            first = platform.rect.left // cell_width
+            last = (platform.rect.right - 1) // cell_width
+            for cell in range(first, last + 1):
+                self.cells.setdefault(cell, []).append((index, platform))
+        self.spans = {}
+
+    def query(self, rect):
+        """Return platforms that may collide with rect, in insertion order"""
+        return self._span(rect.left // self.cell_width, (rect.right - 1) // self.cell_width)
+
+    def overlapping(self, left, right):
+        """Platforms whose rect overlaps the x range from left to right, in insertion order"""
+        span = self._span(int(left // self.cell_width), int(right // self.cell_width))
+        return [platform for platform in span if platform.rect.left < right and platform.rect.right > left]
+
+    def _span(self, first, last):
+        """Cached platforms of columns first to last"""
+        span = self.spans.get((first, last))
+        if span is None:
+            span = self.spans[first, last] = self._merge(first, last)
+        return span
+
+    def _merge(self, first, last):
+        """Platforms of columns first to last, each once, in insertion order"""
+        candidates = {}
+        for cell in range(first, last + 1):
+            for index, platform in self.cells.get(cell, ()):
+                candidates[index] = platform
+        return [candidates[index] for index in sorted(candidates)]
+
+    def __iter__(self):
+        return iter(self.platforms)
+
+    def __len__(self):
+        return len(self.platforms)
+
+
+class ProximityIndex:
+    """Sprites bucketed by rect.centerx into fixed-width columns for range queries.
+
+    The index is kept up to date incrementally: whoever moves an indexed
+    sprite calls moved(), which relocates it only when it crossed into
+    another column, and removed sprites are dropped with discard(). Sprites
+    that do not move (asleep, or between frames) cost nothing. Queries look
+    only at the columns overlapping the range and test the candidates'
+    current centre x, so they cost the number of sprites nearby rather than
+    the number in the level.
+
+    overlapping() returns sprites in the order they were added, so an index
+    built over a group draws overlapping sprites as a pass over the group
+    would.
+    """
+
+    def __init__(self, sprites=(), cell_width=100):
+        self.cell_width = cell_width
+        self.cells = {}
+        self.cell_of = {}
+        self.order = {}
+        self.added = 0
+        self.reach = 0  # Widest half-width seen: how far a rect extends past its centre
+        for sprite in sprites:
+            self.add(sprite)
+
+    def add(self, sprite):
+        """Start tracking sprite"""
+        cell = sprite.rect.centerx // self.cell_width
+        self.cell_of[sprite] = cell
+        self.cells.setdefault(cell, []).append(sprite)
+        self.order[sprite] = self.added
+        self.added += 1
+        self.reach = max(self.reach, sprite.rect.width - sprite.rect.width // 2)
+
+    def moved(self, sprite):
+        """Update the index after sprite changed position, adding it if untracked"""
+        old = self.cell_of.get(sprite)
+        if old is None:
+            self.add(sprite)
+            return
+        cell = sprite.rect.centerx // self.cell_width
+        if cell != old:
+            self._remove_from_cell(sprite, old)
+            self.cell_of[sprite] = cell
+            self.cells.setdefault(cell, []).append(sprite)
+
+    def discard(self, sprite):
+        """Stop tracking sprite if it is tracked"""
+        cell = self.cell_of.pop(sprite, None)
+        if cell is not None:
+            self._remove_from_cell(sprite, cell)
+            del self.order[sprite]
+
+    def _remove_from_cell(self, sprite, cell):
+        members = self.cells[cell]
+        members.remove(sprite)
+        if not members:
+            del self.cells[cell]
+
+    def _candidates(self, x, distance):
+        cells = self.cells
+        for cell in range(int((x - distance) // self.cell_width), int((x + distance) // self.cell_width) + 1):
+            members = cells.get(cell)
+            if members:
+                yield from members
+
+    def any_within(self, x, distance):
+        """True if some sprite's centre x is strictly within distance of x"""
+        return any(abs(sprite.rect.centerx - x) < distance for sprite in self._candidates(x, distance))
+
+    def within(self, x, distance):
+        """Sprites whose centre x is strictly within distance of x"""
+        return [sprite for sprite in self._candidates(x, distance) if abs(sprite.rect.centerx - x) < distance]
+
+    def overlapping(self, left, right):
+        """Sprites whose rect overlaps the x range from left to right, in the order they were added"""
+        center, half_width = (left + right) / 2, (right - left) / 2 + self.reach
+        found = [sprite for sprite in self._candidates(center, half_width)
+                 if sprite.rect.left < right and sprite.rect.right > left]
+        found.sort(key=self.order.__getitem__)
+        return found
+
+    def __len__(self):
+        return len(self.cell_of)
+
+
+class PowerUp:
+    __slots__ = ('type', 'rect', 'timer', 'float_offset', 'base_y')
+    
     def __init__(self, x, y, powerup_type):
-        super().__init__()
         self.type = powerup_type
         self.rect = pygame.Rect(x, y, 30, 30)
         self.timer = 0
@@ -555,11 +767,26 @@ class PowerUp(pygame.sprite.Sprite):
         self.timer += 1
         self.float_offset = math.sin(self.timer * 0.1) * 5
         self.rect.y = int(self.base_y + self.float_offset)
+    
+    def pull_toward(self, x, y, speed):
+        """Move up to speed pixels toward (x, y), keeping the float animation"""
+        dx = x - self.rect.centerx
+        dy = y - self.rect.centery
+        distance = math.hypot(dx, dy)
+        if distance == 0:
+            return
+        step = min(1, speed / distance)
+        move_x = round(dx * step)
+        move_y = round(dy * step)
+        self.rect.x += move_x
+        self.rect.y += move_y
+        self.base_y += move_y
 
 
-class Obstacle(pygame.sprite.Sprite):
+class Obstacle:
+    __slots__ = ('rect', 'obstacle_type', 'damage', 'timer')
+    
     def __init__(self, x, y, width, height, obstacle_type='spike'):
-        super().__init__()
         self.rect = pygame.Rect(x, y, width, height)
         self.obstacle_type = obstacle_type
         self.damage = 30 if obstacle_type == 'spike' else 20
@@ -1,6 +1,8 @@
 import pygame
 from game_logic import GameState
 from game_objects import *
+from level_generator import ENDLESS_LEVEL
+from profiler import PERCENTILES
 
 # Colors for UI
 UI_COLORS = {
@@ -14,64 +16,112 @@ UI_COLORS = {
     'menu_bg': (50, 50, 100, 200)
 }
 
-def draw_game_ui(game):
+# Background gradients as (top color, bottom color)
+BACKGROUND_THEMES = {
+    'sky': ((135, 206, 235), (185, 156, 235))
+}
+
+# Pre-rendered backgrounds keyed by (size, gradient)
+_background_cache = {}
+
+def create_background_gradient(size, gradient):
+    """Render a vertical gradient into a new surface"""
+    width, height = size
+    top, bottom = gradient
+    surf = pygame.Surface(size)
+    for y in range(height):
+        color = tuple(max(0, min(255, int(t + (b - t) * y / height))) for t, b in zip(top, bottom))
+        pygame.draw.line(surf, color, (0, y), (width, y))
+    if pygame.display.get_surface() is not None:
+        surf = surf.convert()
+    return surf
+
+def get_background(size, theme='sky'):
+    """Return the cached background for a screen size and theme"""
+    key = (size, BACKGROUND_THEMES[theme])
+    background = _background_cache.get(key)
+    if background is None:
+        background = _background_cache[key] = create_background_gradient(size, key[1])
+    return background
+
+class RenderCulling:
+    """Culling grids over the platforms and obstacles draw_game_ui draws.
+
+    Platforms and obstacles only change when the game rebuilds its world
+    (tracked by game.world_version). Platforms are culled through the
+    game's own collision grid; obstacles get a PlatformGrid of their own,
+    built then and reused until the next rebuild. Enemies and power-ups
+    move, so they are culled through the game's enemy_index and
+    powerup_index, which its update keeps current; the few mushrooms get a
+    plain pass in group order (see in_view).
+    """
+    
+    def __init__(self):
+        self.game = None
+        self.world_version = None
+        self.platforms = self.obstacles = None
+    
+    def update(self, game):
+        """Bring the grids up to date with game and return self"""
+        if game is not self.game or game.world_version != self.world_version:
+            self.game = game
+            self.world_version = game.world_version
+            self.platforms = game.platform_grid
+            self.obstacles = PlatformGrid(game.obstacles)
+        return self
+
+def in_view(objects, left, right):
+    """Objects whose rect overlaps the x range from left to right, in their own order"""
+    return [obj for obj in objects if obj.rect.left < right and obj.rect.right > left]
+
+_render_culling = RenderCulling()
+
+def draw_game_ui(game, screen=None):
     """Draw main game UI"""
-    screen = game.screen
-    
-    # Background gradient
-    for y in range(900):  # SCREEN_HEIGHT
-        color_r = int(135 + (50 * y / 900))
-        color_g = int(206 - (50 * y / 900))
-        color_b = 235
-        color = (min(255, color_r), max(0, color_g), color_b)
-        pygame.draw.line(screen, color, (0, y), (1400, y))  # SCREEN_WIDTH
-    
-    # Draw platforms
-    for platform in game.platforms:
-        x = platform.rect.x - game.camera_x
-        if -100 < x < 1500:  # Only visible platforms
-            platform_img = game.platform_images.get(platform.platform_type, game.platform_images['normal'])
-            # Tile the platform image
-            for i in range(0, platform.rect.width, 40):
-                if x + i > -40 and x + i < 1440:
-                    screen.blit(platform_img, (x + i, platform.rect.y))
-    
-    # Draw obstacles
-    for obstacle in game.obstacles:
-        x = obstacle.rect.x - game.camera_x
-        if -100 < x < 1500:
-            # Create obstacle sprite on the fly for now
-            obs_surf = pygame.Surface((obstacle.rect.width, obstacle.rect.height))
-            if obstacle.obstacle_type == 'spike':
-                obs_surf.fill(GRAY)
-                # Simple spike representation
-                for i in range(0, obstacle.rect.width, 15):
-                    pygame.draw.polygon(obs_surf, BLACK, [(i+7, 0), (i, obstacle.rect.height), (i+14, obstacle.rect.height)])
-            elif obstacle.obstacle_type == 'lava':
-                obs_surf.fill((255, 50, 0))
-            elif obstacle.obstacle_type == 'saw':
-                obs_surf.fill(GRAY)
-                pygame.draw.circle(obs_surf, BLACK, (obstacle.rect.width//2, obstacle.rect.height//2), 
-                                 min(obstacle.rect.width, obstacle.rect.height)//2, 3)
-            
-            screen.blit(obs_surf, (x, obstacle.rect.y))
-    
-    # Draw Mario
-    mario_x = game.mario.rect.x - game.camera_x
-    if -100 < mario_x < 1500:
-        screen.blit(game.mario.image, (mario_x, game.mario.rect.y))
-        # Mario health bar above head
-        if game.mario.health < game.mario.max_health:
-            health_bg = pygame.Rect(mario_x, game.mario.rect.y - 15, 70, 8)
-            health_fg = pygame.Rect(mario_x, game.mario.rect.y - 15, 
-                                  int(70 * game.mario.health / game.mario.max_health), 8)
-            pygame.draw.rect(screen, UI_COLORS['health_bg'], health_bg)
-            pygame.draw.rect(screen, UI_COLORS['health_fg'], health_fg)
-    
-    # Draw mushrooms
-    for mushroom in game.mushrooms:
-        mushroom_x = mushroom.rect.x - game.camera_x
-        if -100 < mushroom_x < 1500:
+    screen = game.screen if screen is None else screen
+    profiler = game.profiler
+    
+    # Only objects overlapping these bounds can be visible
+    culling = _render_culling.update(game)
+    view_width = screen.get_width()
+    left, right = game.camera_x - 100, game.camera_x + view_width + 100
+    
+    with profiler.scope('draw.background'):
+        # Background gradient, rendered once per size and theme
+        screen.blit(get_background(screen.get_size()), (0, 0))
+    
+    with profiler.scope('draw.platforms'):
+        # Draw platforms from their pre-tiled span images
+        # Span images end on a whole 40px tile, so they can overhang the rect
+        for platform in culling.platforms.overlapping(game.camera_x - 40, game.camera_x + view_width):
+            x = platform.rect.x - game.camera_x
+            span_img = game.platform_span_images[(platform.platform_type, platform.rect.width)]
+            if -span_img.get_width() < x < view_width:  # Only visible platforms
+                screen.blit(span_img, (x, platform.rect.y))
+    
+    with profiler.scope('draw.obstacles'):
+        # Draw obstacles from the pre-rendered atlas
+        for obstacle in culling.obstacles.overlapping(left, right):
+            x = obstacle.rect.x - game.camera_x
+            frames = game.obstacle_images[(obstacle.obstacle_type, obstacle.rect.width, obstacle.rect.height)]
+            screen.blit(frames[(obstacle.timer // 4) % len(frames)], (x, obstacle.rect.y))
+    
+    with profiler.scope('draw.entities'):
+        # Draw Mario
+        mario_x = game.mario.rect.x - game.camera_x
+        if -100 < mario_x < view_width + 100:
+            screen.blit(game.mario.image, (mario_x, game.mario.rect.y))
+            # Mario health bar above head
+            if game.mario.health < game.mario.max_health:
+                health_bg = pygame.Rect(mario_x, game.mario.rect.y - 15, 70, 8)
+                health_fg = pygame.Rect(mario_x, game.mario.rect.y - 15, 
+                                      int(70 * game.mario.health / game.mario.max_health), 8)
+                pygame.draw.rect(screen, UI_COLORS['health_bg'], health_bg)
+                pygame.draw.rect(screen, UI_COLORS['health_fg'], health_fg)
+    
+        # Draw mushrooms
+        for mushroom in in_view(game.mushrooms, left, right):
+            mushroom_x = mushroom.rect.x - game.camera_x
             screen.blit(mushroom.image, (mushroom_x, mushroom.rect.y))
             # Highlight player mushroom
             if mushroom == game.player_mushroom:
@@ -84,7 +134,7 @@ def draw_game_ui(game):
                     (mushroom_x + mushroom.rect.width//2 + 10, mushroom.rect.y - 10)
                 ]
                 pygame.draw.polygon(screen, YELLOW, arrow_points)
-                
+            
                 # Player health bar above
                 if mushroom.health < mushroom.max_health:
                     health_bg = pygame.Rect(mushroom_x, mushroom.rect.y - 30, 60, 8)
@@ -93,10 +143,9 @@ def draw_game_ui(game):
                     pygame.draw.rect(screen, UI_COLORS['health_bg'], health_bg)
                     pygame.draw.rect(screen, UI_COLORS['health_fg'], health_fg)
     
-    # Draw enemies
-    for enemy in game.enemies:
-        enemy_x = enemy.rect.x - game.camera_x
-        if -100 < enemy_x < 1500:
+        # Draw enemies
+        for enemy in game.enemy_index.overlapping(left, right):
+            enemy_x = enemy.rect.x - game.camera_x
             screen.blit(enemy.image, (enemy_x, enemy.rect.y))
             # Enemy health bar
             if enemy.health < enemy.max_health:
@@ -116,10 +165,9 @@ def draw_game_ui(game):
             color = type_colors.get(enemy.enemy_type, RED)
             pygame.draw.circle(screen, color, (enemy_x + 5, enemy.rect.y + 5), 3)
     
-    # Draw power-ups
-    for powerup in game.powerups:
-        powerup_x = powerup.rect.x - game.camera_x
-        if -100 < powerup_x < 1500:
+        # Draw power-ups
+        for powerup in game.powerup_index.overlapping(left, right):
+            powerup_x = powerup.rect.x - game.camera_x
             powerup_img = game.powerup_images[powerup.type]
             screen.blit(powerup_img, (powerup_x, powerup.rect.y))
             # Glowing effect
@@ -127,98 +175,117 @@ def draw_game_ui(game):
                 pygame.draw.circle(screen, WHITE, 
                                  (powerup_x + 15, powerup.rect.y + 15), 20, 2)
     
-    # Draw HUD
-    draw_hud(game)
+    with profiler.scope('draw.hud'):
+        # Draw HUD
+        draw_hud(game, screen)
+
+class HudLayer:
+    """Cached HUD surfaces.
+
+    Each text element remembers the value it was last rendered for and is
+    re-rendered only when that value changes; the background and the static
+    controls line are rendered once.
+    """
+    
+    CONTROLS = "WASD/Arrows - Move, SPACE - Jump, P - Pause"
+    
+    def __init__(self):
+        self.background = None
+        self.texts = {}
+    
+    def get_background(self, width):
+        """Return the translucent HUD strip"""
+        if self.background is None or self.background.get_width() != width:
+            self.background = pygame.Surface((width, 120), pygame.SRCALPHA)
+            self.background.fill(UI_COLORS['background'])
+        return self.background
+    
+    def text(self, font, name, template, value, color):
+        """Return the rendered template for value, re-rendering on change"""
+        key = (font, value, color)
+        cached = self.texts.get(name)
+        if cached is None or cached[0] != key:
+            cached = self.texts[name] = (key, font.render(template.format(value), True, color))
+        return cached[1]
 
-def draw_hud(game):
+_hud_layer = HudLayer()
+
+def draw_hud(game, screen=None):
     """Draw heads-up display"""
-    screen = game.screen
+    screen = game.screen if screen is None else screen
+    hud = _hud_layer
+    player = game.player_mushroom
+    font = game.font_small
     
     # HUD background
-    hud_bg = pygame.Surface((1400, 120), pygame.SRCALPHA)
-    hud_bg.fill(UI_COLORS['background'])
-    screen.blit(hud_bg, (0, 0))
+    screen.blit(hud.get_background(screen.get_width()), (0, 0))
     
     # Main info
-    hud_items = [
-        f"Level: {game.current_level}",
-        f"Score: {game.score}",
-        f"Lives: {game.lives}",
-        f"Time: {game.time_left}",
-        f"Health: {game.player_mushroom.health}"
-    ]
-    
-    for i, item in enumerate(hud_items):
-        color = UI_COLORS['text_primary'] if i < 3 else UI_COLORS['text_danger'] if 'Health' in item and game.player_mushroom.health < 30 else UI_COLORS['text_secondary']
-        text = game.font_small.render(item, True, color)
+    health_color = UI_COLORS['text_danger'] if player.health < 30 else UI_COLORS['text_secondary']
+    hud_items = (
+        ('level', "Level: {}", 'Endless' if game.loaded_level == ENDLESS_LEVEL else game.current_level,
+         UI_COLORS['text_primary']),
+        ('score', "Score: {}", game.score, UI_COLORS['text_primary']),
+        ('lives', "Lives: {}", game.lives, UI_COLORS['text_primary']),
+        ('time', "Time: {}", game.time_left, UI_COLORS['text_secondary']),
+        ('health', "Health: {}", player.health, health_color)
+    )
+    
+    for i, (name, template, value, color) in enumerate(hud_items):
+        text = hud.text(font, name, template, value, color)
         screen.blit(text, (20 + (i % 3) * 250, 20 + (i // 3) * 30))
     
     # Controls info
-    controls = "WASD/Arrows - Move, SPACE - Jump, P - Pause"
-    control_text = game.font_small.render(controls, True, UI_COLORS['text_secondary'])
-    screen.blit(control_text, (20, 80))
+    screen.blit(hud.text(font, 'controls', HudLayer.CONTROLS, None, UI_COLORS['text_secondary']), (20, 80))
     
     # Power-up status
+    powerup_timers = (
+        ('speed_boost', "Speed Boost: {}s", player.speed_boost_timer, BLUE),
+        ('super_jump', "Super Jump: {}s", player.super_jump_timer, YELLOW),
+        ('invincibility', "Invincible: {}s", player.invincibility_timer, PURPLE),
+        ('magnet', "Magnet: {}s", player.magnet_timer, ORANGE)
+    )
+    
     powerup_y = 20
-    if game.player_mushroom.speed_boost_timer > 0:
-        speed_text = game.font_small.render(f"Speed Boost: {game.player_mushroom.speed_boost_timer//60}s", True, BLUE)
-        screen.blit(speed_text, (1000, powerup_y))
-        powerup_y += 25
-    
-    if game.player_mushroom.super_jump_timer > 0:
-        jump_text = game.font_small.render(f"Super Jump: {game.player_mushroom.super_jump_timer//60}s", True, YELLOW)
-        screen.blit(jump_text, (1000, powerup_y))
-        powerup_y += 25
-    
-    if game.player_mushroom.invincibility_timer > 0:
-        inv_text = game.font_small.render(f"Invincible: {game.player_mushroom.invincibility_timer//60}s", True, PURPLE)
-        screen.blit(inv_text, (1000, powerup_y))
-        powerup_y += 25
-    
-    if game.player_mushroom.magnet_timer > 0:
-        mag_text = game.font_small.render(f"Magnet: {game.player_mushroom.magnet_timer//60}s", True, ORANGE)
-        screen.blit(mag_text, (1000, powerup_y))
+    for name, template, timer, color in powerup_timers:
+        if timer > 0:
+            text = hud.text(font, name, template, timer // 60, color)
+            screen.blit(text, (1000, powerup_y))
+            powerup_y += 25
 
-def draw_menu(game):
+def draw_menu(game, screen=None):
     """Draw main menu"""
-    screen = game.screen
+    screen = game.screen if screen is None else screen
+    center_x = screen.get_rect().centerx
     screen.fill((20, 30, 60))
     
-    # Load and display the meme image at the top
-    try:
-        meme_img = pygame.image.load("mario_meme.jpeg")
-        # Scale the image to fit nicely at the top
-        img_width, img_height = meme_img.get_size()
-        max_width = 400
-        if img_width > max_width:
-            scale_factor = max_width / img_width
-            new_width = int(img_width * scale_factor)
-            new_height = int(img_height * scale_factor)
-            meme_img = pygame.transform.scale(meme_img, (new_width, new_height))
-        
+    # Display the meme image at the top, scaled to fit (loaded once)
+    meme_img = game.assets.get_image("mario_meme.jpeg", max_width=400)
+    if meme_img is not None:
         # Center the image at the top
-        img_rect = meme_img.get_rect(center=(700, 100))
+        img_rect = meme_img.get_rect(center=(center_x, 100))
         screen.blit(meme_img, img_rect)
         
         # Adjust title position to be below the image
         title_y = img_rect.bottom + 30
-    except (pygame.error, FileNotFoundError):
+    else:
         # If image fails to load, use original title position
         title_y = 200
     
     # Title
     title = game.font_large.render("SUPER MUSHROOM", True, UI_COLORS['text_secondary'])
-    title_rect = title.get_rect(center=(700, title_y))
+    title_rect = title.get_rect(center=(center_x, title_y))
     screen.blit(title, title_rect)
     
     subtitle = game.font_medium.render("Battle Edition", True, UI_COLORS['text_primary'])
-    subtitle_rect = subtitle.get_rect(center=(700, title_y + 70))
+    subtitle_rect = subtitle.get_rect(center=(center_x, title_y + 70))
     screen.blit(subtitle, subtitle_rect)
     
     # Menu items
     menu_items = [
         "ENTER - Start Game",
         "L - Level Select",
+        "E - Endless Mode",
         "ESC - Exit",
         f"Current Level: {game.current_level}",
         f"Total Score: {game.score}"
@@ -228,9 +295,9 @@ def draw_menu(game):
     menu_start_y = title_y + 150
     
     for i, item in enumerate(menu_items):
-        color = UI_COLORS['text_primary'] if i < 3 else UI_COLORS['text_secondary']
+        color = UI_COLORS['text_primary'] if i < 4 else UI_COLORS['text_secondary']
         text = game.font_small.render(item, True, color)
-        text_rect = text.get_rect(center=(700, menu_start_y + i * 50))
+        text_rect = text.get_rect(center=(center_x, menu_start_y + i * 50))
         screen.blit(text, text_rect)
     
     # Feature highlights
@@ -246,16 +313,17 @@ def draw_menu(game):
     
     for i, feature in enumerate(features):
         text = game.font_small.render(feature, True, UI_COLORS['text_success'])
-        text_rect = text.get_rect(center=(700, features_start_y + i * 30))
+        text_rect = text.get_rect(center=(center_x, features_start_y + i * 30))
         screen.blit(text, text_rect)
 
-def draw_level_select(game):
+def draw_level_select(game, screen=None):
     """Draw level selection"""
-    screen = game.screen
+    screen = game.screen if screen is None else screen
+    center_x = screen.get_rect().centerx
     screen.fill((30, 20, 60))
     
     title = game.font_large.render("SELECT LEVEL", True, UI_COLORS['text_secondary'])
-    title_rect = title.get_rect(center=(700, 150))
+    title_rect = title.get_rect(center=(center_x, 150))
     screen.blit(title, title_rect)
     
     # Level buttons
@@ -271,7 +339,7 @@ def draw_level_select(game):
         level_num = i + 1
         color = UI_COLORS['text_success'] if level_num <= game.current_level else UI_COLORS['health_bg']
         text = game.font_medium.render(name, True, color)
-        text_rect = text.get_rect(center=(700, 250 + i * 80))
+        text_rect = text.get_rect(center=(center_x, 250 + i * 80))
         
         # Highlight available levels
         if level_num <= game.current_level:
@@ -283,34 +351,36 @@ def draw_level_select(game):
     
     # Instructions
     instruction = game.font_small.render("Press number key to select level or ESC to go back", True, UI_COLORS['text_primary'])
-    instruction_rect = instruction.get_rect(center=(700, 750))
+    instruction_rect = instruction.get_rect(center=(center_x, 750))
     screen.blit(instruction, instruction_rect)
 
-def draw_pause_overlay(game):
+def draw_pause_overlay(game, screen=None):
     """Draw pause overlay"""
-    screen = game.screen
-    overlay = pygame.Surface((1400, 900), pygame.SRCALPHA)
+    screen = game.screen if screen is None else screen
+    center_x = screen.get_rect().centerx
+    overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
     overlay.fill(UI_COLORS['background'])
     screen.blit(overlay, (0, 0))
     
     pause_text = game.font_large.render("PAUSED", True, UI_COLORS['text_primary'])
-    pause_rect = pause_text.get_rect(center=(700, 450))
+    pause_rect = pause_text.get_rect(center=(center_x, 450))
     screen.blit(pause_text, pause_rect)
     
     instruction = game.font_medium.render("Press P to continue", True, UI_COLORS['text_secondary'])
-    instruction_rect = instruction.get_rect(center=(700, 520))
+    instruction_rect = instruction.get_rect(center=(center_x, 520))
     screen.blit(instruction, instruction_rect)
 
-def draw_level_complete(game):
+def draw_level_complete(game, screen=None):
     """Draw level completion screen"""
-    screen = game.screen
-    overlay = pygame.Surface((1400, 900), pygame.SRCALPHA)
+    screen = game.screen if screen is None else screen
+    center_x = screen.get_rect().centerx
+    overlay = pygame.Surface(screen.get_size(), pygame.SRCALPHA)
     overlay.fill(UI_COLORS['background'])
     screen.blit(overlay, (0, 0))
     
     # Title
     complete_text = game.font_large.render("LEVEL COMPLETE!", True, UI_COLORS['text_success'])
-    complete_rect = complete_text.get_rect(center=(700, 300))
+    complete_rect = complete_text.get_rect(center=(center_x, 300))
     screen.blit(complete_text, complete_rect)
     
     # Stats
@@ -323,24 +393,27 @@ def draw_level_complete(game):
     
     for i, stat in enumerate(stats):
         text = game.font_medium.render(stat, True, UI_COLORS['text_primary'])
-        text_rect = text.get_rect(center=(700, 400 + i * 50))
+        text_rect = text.get_rect(center=(center_x, 400 + i * 50))
         screen.blit(text, text_rect)
     
     # Instructions
-    if game.current_level < game.max_level:
+    if not game.next_level_ready():
+        instruction = game.font_small.render("Loading next level...", True, UI_COLORS['text_secondary'])
+    elif game.current_level < game.max_level:
         instruction = game.font_small.render("ENTER - Next Level, ESC - Menu", True, UI_COLORS['text_secondary'])
     else:
         instruction = game.font_small.render("ENTER - Back to Menu", True, UI_COLORS['text_secondary'])
-    instruction_rect = instruction.get_rect(center=(700, 650))
+    instruction_rect = instruction.get_rect(center=(center_x, 650))
     screen.blit(instruction, instruction_rect)
 
-def draw_game_over(game):
+def draw_game_over(game, screen=None):
     """Draw game over screen"""
-    screen = game.screen
+    screen = game.screen if screen is None else screen
+    center_x = screen.get_rect().centerx
     screen.fill((40, 0, 0))
     
     game_over_text = game.font_large.render("GAME OVER", True, UI_COLORS['text_danger'])
-    game_over_rect = game_over_text.get_rect(center=(700, 300))
+    game_over_rect = game_over_text.get_rect(center=(center_x, 300))
     screen.blit(game_over_text, game_over_rect)
     
     # Final stats
@@ -352,29 +425,209 @@ def draw_game_over(game):
     
     for i, stat in enumerate(stats):
         text = game.font_medium.render(stat, True, UI_COLORS['text_primary'])
-        text_rect = text.get_rect(center=(700, 400 + i * 50))
+        text_rect = text.get_rect(center=(center_x, 400 + i * 50))
         screen.blit(text, text_rect)
     
     # Instructions
     restart_text = game.font_small.render("ENTER - Try Again, ESC - Menu", True, UI_COLORS['text_secondary'])
-    restart_rect = restart_text.get_rect(center=(700, 600))
+    restart_rect = restart_text.get_rect(center=(center_x, 600))
     screen.blit(restart_text, restart_rect)
 
-def draw_ui(game):
-    """Main UI drawing function"""
+class ProfilerOverlay:
+    """Frame-time table drawn over the game while the profiler overlay is on.
+
+    The table is re-rendered every REFRESH_FRAMES profiled frames rather
+    than every frame, so it stays readable and cheap.
+    """
+    
+    REFRESH_FRAMES = 30
+    LINE_HEIGHT = 18
+    LABEL_WIDTH = 110
+    COLUMN_WIDTH = 60
+    
+    def __init__(self):
+        self.font = None
+        self.surface = None
+        self.rendered_at = None
+    
+    def render(self, profiler):
+        """Render the percentile table for the profiler's window"""
+        if self.font is None:
+            self.font = pygame.font.Font(None, 22)
+        rows = [('scope', *(f'p{p} ms' for p in PERCENTILES))]
+        for name, stats in profiler.summary().items():
+            label = '  ' * name.count('.') + name.rsplit('.', 1)[-1]
+            rows.append((label, *(f"{stats[f'p{p}']:.2f}" for p in PERCENTILES)))
+        size = (self.LABEL_WIDTH + len(PERCENTILES) * self.COLUMN_WIDTH + 20, len(rows) * self.LINE_HEIGHT + 10)
+        surface = pygame.Surface(size, pygame.SRCALPHA)
+        surface.fill(UI_COLORS['background'])
+        for i, row in enumerate(rows):
+            color = UI_COLORS['text_secondary'] if i == 0 else UI_COLORS['text_primary']
+            y = 5 + i * self.LINE_HEIGHT
+            surface.blit(self.font.render(row[0], True, color), (10, y))
+            # Numbers right-aligned in their columns
+            for column, cell in enumerate(row[1:], 1):
+                text = self.font.render(cell, True, color)
+                surface.blit(text, (10 + self.LABEL_WIDTH + column * self.COLUMN_WIDTH - text.get_width(), y))
+        return surface
+    
+    def draw(self, game, screen):
+        """Draw the table in the top right corner"""
+        profiler = game.profiler
+        if game.font_small is None:
+            return  # Headless: no fonts
+        refresh = profiler.frame_count // self.REFRESH_FRAMES
+        if self.surface is None or refresh != self.rendered_at:
+            self.surface = self.render(profiler)
+            self.rendered_at = refresh
+        screen.blit(self.surface, (screen.get_width() - self.surface.get_width() - 10, 130))
+
+_profiler_overlay = ProfilerOverlay()
+
+def draw_screen(game, screen=None):
+    """Draw the current state without presenting it.
+
+    screen is the target surface, game.screen by default, so frames can be
+    rendered offscreen. Text is centred and the world view culled on the
+    target's width; vertical layout assumes the 900 px screen height, so a
+    shorter target cuts off the lowest lines.
+    """
+    if screen is None:
+        screen = game.screen
     if game.state == GameState.MENU:
-        draw_menu(game)
+        draw_menu(game, screen)
     elif game.state == GameState.LEVEL_SELECT:
-        draw_level_select(game)
+        draw_level_select(game, screen)
     elif game.state == GameState.PLAYING:
-        draw_game_ui(game)
+        draw_game_ui(game, screen)
     elif game.state == GameState.PAUSED:
-        draw_game_ui(game)
-        draw_pause_overlay(game)
+        draw_game_ui(game, screen)
+        draw_pause_overlay(game, screen)
     elif game.state == GameState.LEVEL_COMPLETE:
-        draw_game_ui(game)
-        draw_level_complete(game)
+        draw_game_ui(game, screen)
+        draw_level_complete(game, screen)
     elif game.state == GameState.GAME_OVER:
-        draw_game_over(game)
+        draw_game_over(game, screen)
     
-    pygame.display.flip()
\ No newline at end of file
+    if game.profiler.overlay:
+        _profiler_overlay.draw(game, screen)
+
+def draw_ui(game):
+    """Main UI drawing function"""
+    draw_screen(game)
+    with game.profiler.scope('draw.present'):
+        pygame.display.flip()
+
+def static_screen_key(game):
+    """Return everything a static screen shows, or None if the state animates.
+
+    The world is frozen outside PLAYING, so two equal keys mean the screen
+    would be redrawn pixel for pixel.
+    """
+    if game.state == GameState.MENU:
+        return (game.state, game.current_level, game.score)
+    elif game.state == GameState.LEVEL_SELECT:
+        return (game.state, game.current_level)
+    elif game.state == GameState.PAUSED:
+        return (game.state,)
+    elif game.state == GameState.LEVEL_COMPLETE:
+        return (game.state, game.current_level, game.score, game.time_left, game.player_mushroom.health,
+                game.next_level_ready())
+    elif game.state == GameState.GAME_OVER:
+        return (game.state, game.current_level, game.score, game.lives)
+    return None
+
+def _common_prefix(a, b):
+    """Length of the longest common prefix of two equal-length byte strings"""
+    low, high = 0, len(a)
+    while low < high:
+        middle = (low + high + 1) // 2
+        if a[:middle] == b[:middle]:
+            low = middle
+        else:
+            high = middle - 1
+    return low
+
+def _common_suffix(a, b):
+    """Length of the longest common suffix of two equal-length byte strings"""
+    return _common_prefix(a[::-1], b[::-1])
+
+def changed_rects(before, after, size, pitch, bytesize, band_height=16):
+    """Rects covering the pixels that differ between two frames' raw bytes.
+    
+    Rows are compared in bands of band_height lines, so unchanged bands
+    cost one comparison; each changed band is narrowed to the columns
+    between the first and last difference on its rows, and touching
+    changed bands are merged.
+    """
+    width, height = size
+    rects = []
+    for top in range(0, height, band_height):
+        bottom = min(top + band_height, height)
+        start, end = top * pitch, bottom * pitch
+        if before[start:end] == after[start:end]:
+            continue
+        left, right = width, 0
+        for row in range(start, end, pitch):
+            old, new = before[row:row + width * bytesize], after[row:row + width * bytesize]
+            if old != new:
+                left = min(left, _common_prefix(old, new) // bytesize)
+                right = max(right, width - _common_suffix(old, new) // bytesize)
+        rect = pygame.Rect(left, top, right - left, bottom - top)
+        # Changed bands that touch are presented as one rect
+        if rects and rects[-1].bottom == top:
+            rects[-1].union_ip(rect)
+        else:
+            rects.append(rect)
+    return rects
+
+class DirtyRectRenderer:
+    """Optional replacement for draw_ui that only presents changed regions.
+    
+    Static screens are drawn once and then skipped until what they show
+    changes; the new frame is then compared with the last one presented and
+    only the rects that differ (a HUD text, a menu line) are pushed with
+    pygame.display.update instead of a full flip. Gameplay scrolls the
+    whole view, so it updates the full screen.
+    """
+    
+    BAND_HEIGHT = 16
+    
+    def __init__(self):
+        self.last_key = None
+        self.last_frame = None  # Raw pixels of the last static frame presented
+    
+    def invalidate(self):
+        """Force the next frame to redraw, e.g. after the window was exposed"""
+        self.last_key = None
+        self.last_frame = None
+    
+    def draw(self, game):
+        """Draw a frame and return the list of rects sent to the display"""
+        if game.redraw_requested:
+            game.redraw_requested = False
+            self.invalidate()
+        
+        # The profiler overlay changes on its own, so it disables skipping
+        key = None if game.profiler.overlay else static_screen_key(game)
+        if key is not None and key == self.last_key:
+            return []
+        self.last_key = key
+        
+        screen = game.screen
+        draw_screen(game)
+        if key is None:
+            self.last_frame = None
+            dirty_rects = [screen.get_rect()]
+        else:
+            frame = screen.get_buffer().raw
+            if self.last_frame is None or len(frame) != len(self.last_frame):
+                dirty_rects = [screen.get_rect()]
+            else:
+                dirty_rects = changed_rects(self.last_frame, frame, screen.get_size(), screen.get_pitch(),
+                                            screen.get_bytesize(), self.BAND_HEIGHT)
+            self.last_frame = frame
+        if dirty_rects:
+            with game.profiler.scope('draw.present'):
+                pygame.display.update(dirty_rects)
+        return dirty_rects
@@ -3,10 +3,6 @@ import random
 import math
 from game_objects import *
 
-# Screen constants
-SCREEN_WIDTH = 1400
-SCREEN_HEIGHT = 900
-
 def create_mario_sprite():
     """Create Mario sprite"""
     surf = pygame.Surface((70, 90), pygame.SRCALPHA)
@@ -137,6 +133,15 @@ def create_platform_sprite(color, width=40, height=20):
     pygame.draw.rect(surf, dark_color, (0, 0, width, height), 2)
     return surf
 
+def create_platform_span_sprite(tile_image, width):
+    """Pre-render a platform span by tiling its 40px image across the width"""
+    tile_width, tile_height = tile_image.get_size()
+    tiles = -(-width // tile_width)  # Last tile overhangs like the per-tile draw did
+    surf = pygame.Surface((tiles * tile_width, tile_height), pygame.SRCALPHA)
+    for i in range(tiles):
+        surf.blit(tile_image, (i * tile_width, 0))
+    return surf
+
 def create_powerup_sprite(color):
     """Create power-up sprite"""
     surf = pygame.Surface((30, 30), pygame.SRCALPHA)
@@ -155,7 +160,7 @@ def create_powerup_sprite(color):
         pygame.draw.rect(surf, WHITE, (10, 12, 10, 6))
     return surf
 
-def create_obstacle_sprite(obstacle_type, width, height):
+def create_obstacle_sprite(obstacle_type, width, height, rotation=0, rng=random):
     """Create obstacle sprite"""
     surf = pygame.Surface((width, height), pygame.SRCALPHA)
     
@@ -183,7 +188,8 @@ def create_obstacle_sprite(obstacle_type, width, height):
         pygame.draw.circle(surf, GRAY, (center_x, center_y), radius)
         pygame.draw.circle(surf, BLACK, (center_x, center_y), radius, 2)
         # Saw teeth
-        for angle in range(0, 360, 30):
+        for tooth in range(0, 360, 30):
+            angle = tooth + rotation
             x = center_x + (radius-5) * math.cos(math.radians(angle))
             y = center_y + (radius-5) * math.sin(math.radians(angle))
             outer_x = center_x + radius * math.cos(math.radians(angle))
@@ -195,12 +201,38 @@ def create_obstacle_sprite(obstacle_type, width, height):
         pygame.draw.rect(surf, (255, 50, 0), (0, 0, width, height))
         # Lava bubbles
         for i in range(width//20):
-            bubble_x = random.randint(5, width-5)
-            bubble_y = random.randint(5, height-5)
-            pygame.draw.circle(surf, YELLOW, (bubble_x, bubble_y), random.randint(2, 5))
+            bubble_x = rng.randint(5, width-5)
+            bubble_y = rng.randint(5, height-5)
+            pygame.draw.circle(surf, YELLOW, (bubble_x, bubble_y), rng.randint(2, 5))
     
     return surf
 
+# Frames in the saw's rotation strip; teeth repeat every 30 degrees
+SAW_FRAMES = 6
+
+def create_obstacle_frames(obstacle_type, width, height):
+    """Create the animation strip for an obstacle (one frame if static)"""
+    # Lava bubbles come from their own seeded generator, so every pit of a
+    # size looks the same and rendering never draws from the game's RNG
+    rng = random.Random(f"{obstacle_type}:{width}x{height}")
+    if obstacle_type == 'saw':
+        return [create_obstacle_sprite(obstacle_type, width, height, frame * 30 / SAW_FRAMES, rng)
+                for frame in range(SAW_FRAMES)]
+    return [create_obstacle_sprite(obstacle_type, width, height, rng=rng)]
+
+def merge_platform_spans(platforms):
+    """Merge runs of touching platforms with the same row and type into spans"""
+    merged = []
+    for platform in platforms:
+        x, y, w, h, p_type = platform
+        if merged:
+            last_x, last_y, last_w, last_h, last_type = merged[-1]
+            if last_x + last_w == x and (last_y, last_h, last_type) == (y, h, p_type):
+                merged[-1] = (last_x, last_y, last_w + w, last_h, last_type)
+                continue
+        merged.append(platform)
+    return merged
+
 def create_level_platforms(level_num):
     """Generate platforms for a level with obstacles"""
     platforms = []
@@ -209,14 +241,14 @@ def create_level_platforms(level_num):
     powerups = []
     
     # Create solid ground first - ensure continuous ground
-    ground_y = SCREEN_HEIGHT - 50
+    ground_y = GROUND_Y
     world_width = SCREEN_WIDTH * 2
     
     # Create continuous ground for all levels
     for x in range(0, world_width, 40):
         platform_type = ['normal', 'ice', 'lava', 'cloud', 'metal'][min(level_num - 1, 4)]
         # Make sure ground is solid
-        platform = (x, ground_y, 40, 50, 'normal')  # Always use normal type for ground
+        platform = (x, ground_y, 40, GROUND_HEIGHT, 'normal')  # Always use normal type for ground
         platforms.append(platform)
     
     # Add gaps in ground only for higher levels
@@ -378,4 +410,70 @@ def create_level_platforms(level_num):
         if level_num == 5:
             powerup_positions.append((600, SCREEN_HEIGHT - 550, PowerUpType.MAGNET))
     
-    return platforms + platform_data, obstacle_data, enemy_data, powerup_positions
\ No newline at end of file
+    # Collapse the 40px ground tiles into one span per stretch between gaps
+    platforms = merge_platform_spans(platforms)
+    
+    return platforms + platform_data, obstacle_data, enemy_data, powerup_positions
+
+# Endless mode: the world is generated in fixed-width chunks
+ENDLESS_LEVEL = 0
+CHUNK_WIDTH = 1400  # must be a multiple of the 40px ground tile
+ENDLESS_WORLD_WIDTH = 10 ** 9
+CHUNK_PLATFORM_WIDTHS = (80, 100, 120, 150, 200)
+CHUNK_PLATFORM_TYPES = ('normal', 'normal', 'ice', 'cloud', 'metal', 'lava')
+CHUNK_OBSTACLE_TYPES = ('spike', 'spike', 'lava', 'saw')
+
+def generate_chunk(seed, index, chunk_width=CHUNK_WIDTH):
+    """Generate chunk index of an endless level.
+
+    Returns the same (platforms, obstacles, enemies, powerups) data as
+    create_level_platforms, in world coordinates, covering x from
+    index * chunk_width to (index + 1) * chunk_width. The content depends
+    only on seed and index, so a chunk that was evicted comes back the same.
+    Sizes are drawn from small fixed sets so the sprite caches stay bounded
+    however far the player goes.
+    """
+    rng = random.Random(f"{seed}:chunk:{index}")
+    left = index * chunk_width
+    difficulty = min(index, 12)
+    
+    # Ground, with gaps of whole tiles from the second chunk on
+    tiles = chunk_width // 40
+    gaps = set()
+    if index > 0:
+        for _ in range(rng.randint(0, 1 + difficulty // 4)):
+            start = rng.randrange(2, tiles - 5)
+            gaps.update(range(start, start + rng.randint(2, 3)))
+    ground = [(left + tile * 40, GROUND_Y, 40, GROUND_HEIGHT, 'normal')
+              for tile in range(tiles) if tile not in gaps]
+    platforms = merge_platform_spans(ground)
+    
+    # Floating platforms
+    for _ in range(rng.randint(3, 5)):
+        x = left + rng.randrange(0, chunk_width - 200, 20)
+        y = SCREEN_HEIGHT - rng.randrange(150, 501, 10)
+        platforms.append((x, y, rng.choice(CHUNK_PLATFORM_WIDTHS), 20, rng.choice(CHUNK_PLATFORM_TYPES)))
+    
+    # The first chunk is where the player starts, so it stays safe
+    obstacles = []
+    enemies = []
+    if index > 0:
+        for _ in range(rng.randint(0, 1 + difficulty // 3)):
+            x = left + rng.randrange(100, chunk_width - 100, 20)
+            obstacle_type = rng.choice(CHUNK_OBSTACLE_TYPES)
+            if obstacle_type == 'saw':
+                obstacles.append((x, SCREEN_HEIGHT - rng.randrange(250, 451, 10), 30, 30, 'saw'))
+            else:
+                obstacles.append((x, SCREEN_HEIGHT - 70, rng.choice((60, 80, 100)), 20, obstacle_type))
+        
+        enemy_types = list(EnemyType)[:min(4, 1 + index // 2)]
+        for _ in range(rng.randint(1, 2 + difficulty // 2)):
+            x = left + rng.randrange(100, chunk_width - 100, 10)
+            enemies.append((x, SCREEN_HEIGHT - 100, rng.choice(enemy_types)))
+    
+    powerups = []
+    if rng.random() < 0.5:
+        x = left + rng.randrange(100, chunk_width - 100, 10)
+        powerups.append((x, SCREEN_HEIGHT - rng.randrange(300, 451, 10), rng.choice(list(PowerUpType))))
+    
+    return platforms, obstacles, enemies, powerups
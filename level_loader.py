@@ -0,0 +1,104 @@
+"""Level construction split into a build step and a commit step.
+
+build_level turns a level number into ready-made static objects (platforms,
+obstacles, power-ups and the platform collision grid). It touches neither
+the display nor the game's random generator, so it can run on a worker
+thread. Game.load_level then commits the result on the main thread, which
+only has to create the enemies, Mario and the mushrooms.
+
+LevelLoader runs builds on a single background thread so the next level can
+be prefetched while the level-complete screen is up.
+"""
+
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+
+import pygame
+
+from game_objects import Obstacle, Platform, PlatformGrid, PowerUp
+from level_generator import create_level_platforms
+
+# Everything build_level produces; enemy_data stays as generator tuples
+# because creating enemies draws from the game's random generator
+LevelBuild = namedtuple('LevelBuild', ['level_num', 'platforms', 'obstacles', 'enemy_data',
+                                       'powerups', 'platform_grid'])
+
+def build_static_objects(platform_data, obstacle_data, powerup_data):
+    """Create platforms, obstacles and power-ups from generator data"""
+    platforms = [Platform(*data) for data in platform_data if len(data) == 5]
+    obstacles = [Obstacle(*data) for data in obstacle_data]
+    powerups = [PowerUp(*data) for data in powerup_data]
+    return platforms, obstacles, powerups
+
+def build_level(level_num):
+    """Generate a fixed level and build its static objects"""
+    platform_data, obstacle_data, enemy_data, powerup_data = create_level_platforms(level_num)
+    platforms, obstacles, powerups = build_static_objects(platform_data, obstacle_data, powerup_data)
+    return LevelBuild(level_num, platforms, obstacles, enemy_data, powerups, PlatformGrid(platforms))
+
+class LevelLoader:
+    """Builds levels on a background thread.
+
+    prefetch() starts a build, ready() is the non-blocking handshake the
+    main loop polls, and take() hands the finished build over, waiting for
+    it if needed or building on the spot if nothing was prefetched. Each
+    build is handed out once, since the game takes ownership of its objects.
+    """
+
+    def __init__(self, build=build_level):
+        self.build = build
+        self.executor = None
+        self.pending = {}
+
+    def prefetch(self, level_num):
+        """Start building level_num in the background unless already started"""
+        if level_num in self.pending:
+            return
+        if self.executor is None:
+            self.executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='level-loader')
+        self.pending[level_num] = self.executor.submit(self.build, level_num)
+
+    def ready(self, level_num):
+        """False only while a prefetch of level_num is still running"""
+        future = self.pending.get(level_num)
+        return future is None or future.done()
+
+    def take(self, level_num):
+        """Return the build for level_num, waiting for or running it as needed"""
+        future = self.pending.pop(level_num, None)
+        if future is None:
+            return self.build(level_num)
+        return future.result()
+
+    def shutdown(self):
+        """Stop the worker thread, dropping unfinished prefetches"""
+        if self.executor is not None:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+            self.executor = None
+        self.pending.clear()
+
+
+# A level as first loaded: its objects plus a snapshot of every dynamic
+# object's state and of the game's random generator, so a respawn can put
+# the level back by copying state instead of building it again. Platforms
+# and the grid never change and are shared as they are.
+CompiledLevel = namedtuple('CompiledLevel', ['platforms', 'obstacles', 'enemies', 'powerups', 'mario',
+                                             'player', 'allies', 'platform_grid', 'rng_state', 'states'])
+
+def capture_state(obj):
+    """Snapshot an object's attributes for restore_state.
+
+    Sprites list the attributes that change during play in
+    STATE_ATTRIBUTES; the slotted level objects save their __slots__.
+    Rects are copied since they are changed in place.
+    """
+    state = {}
+    for name in getattr(obj, 'STATE_ATTRIBUTES', None) or obj.__slots__:
+        value = getattr(obj, name)
+        state[name] = value.copy() if isinstance(value, pygame.Rect) else value
+    return state
+
+def restore_state(obj, state):
+    """Put back attributes saved by capture_state"""
+    for name, value in state.items():
+        setattr(obj, name, value.copy() if isinstance(value, pygame.Rect) else value)
@@ -0,0 +1,101 @@
+"""Chunk streaming for the endless level.
+
+The endless world is cut into CHUNK_WIDTH-wide chunks generated from the
+game seed by level_generator.generate_chunk. ChunkStreamer keeps only the
+chunks around the camera loaded: missing ones ahead are generated a few per
+frame, nearest first, and ones left far behind (or ahead, after walking
+back) are evicted along with any enemies, allies and power-ups standing in
+them. Memory therefore stays bounded however far the player travels.
+
+Power-ups the player collected are remembered per chunk, so a chunk that
+is evicted and generated again does not bring them back to be farmed.
+"""
+
+from collections import namedtuple
+
+from level_generator import CHUNK_WIDTH, SCREEN_WIDTH, generate_chunk
+
+# A loaded chunk and the static objects and power-ups it created
+LevelChunk = namedtuple('LevelChunk', ['index', 'platforms', 'obstacles', 'powerups'])
+
+class ChunkStreamer:
+    """Loads and evicts endless-level chunks around the camera.
+
+    Chunks from behind chunks left of the screen to ahead chunks right of
+    it are wanted; a loaded chunk is evicted once it is more than one chunk
+    outside that range, so small camera moves never thrash. Objects are
+    created and removed through the game's spawn_level_content and
+    remove_level_content. The game reports collected power-ups with
+    collected(); their generator entries are left out whenever their chunk
+    is generated again.
+    """
+
+    def __init__(self, game, seed, chunk_width=CHUNK_WIDTH, ahead=1, behind=1, chunks_per_frame=1):
+        self.game = game
+        self.seed = seed
+        self.chunk_width = chunk_width
+        self.ahead = ahead
+        self.behind = behind
+        self.chunks_per_frame = chunks_per_frame
+        self.chunks = {}
+        self.taken = {}  # Chunk index -> generator entries of collected power-ups
+        self.origins = {}  # Loaded power-up -> (chunk index, its generator entry)
+
+    def wanted_range(self, camera_x):
+        """First and last chunk index that should be loaded for camera_x"""
+        first = max(0, int(camera_x // self.chunk_width) - self.behind)
+        last = int((camera_x + SCREEN_WIDTH) // self.chunk_width) + self.ahead
+        return first, last
+
+    def update(self, camera_x, budget=None):
+        """Evict far chunks and load up to budget missing ones.
+
+        budget defaults to chunks_per_frame; pass a large number to load
+        everything at once. Returns True if any chunk was loaded or evicted,
+        in which case the caller must refresh whatever indexes the world.
+        """
+        if budget is None:
+            budget = self.chunks_per_frame
+        first, last = self.wanted_range(camera_x)
+        changed = False
+
+        for index in [i for i in self.chunks if i < first - 1 or i > last + 1]:
+            chunk = self.chunks.pop(index)
+            for powerup in chunk.powerups:
+                self.origins.pop(powerup, None)
+            self.game.remove_level_content(chunk.platforms, chunk.obstacles, *self.loaded_bounds())
+            changed = True
+
+        missing = [i for i in range(first, last + 1) if i not in self.chunks]
+        center = (camera_x + SCREEN_WIDTH / 2) // self.chunk_width
+        missing.sort(key=lambda index: abs(index - center))
+        for index in missing[:budget]:
+            platform_data, obstacle_data, enemy_data, powerup_data = generate_chunk(self.seed, index,
+                                                                                    self.chunk_width)
+            taken = self.taken.get(index, ())
+            powerup_data = [entry for entry in powerup_data if entry not in taken]
+            platforms, obstacles, powerups = self.game.spawn_level_content(platform_data, obstacle_data,
+                                                                           enemy_data, powerup_data)
+            for powerup, entry in zip(powerups, powerup_data):
+                self.origins[powerup] = (index, entry)
+            self.chunks[index] = LevelChunk(index, platforms, obstacles, powerups)
+            changed = True
+        return changed
+
+    def fill(self, camera_x):
+        """Load every wanted chunk at once, as when the level starts"""
+        first, last = self.wanted_range(camera_x)
+        return self.update(camera_x, budget=last - first + 1)
+
+    def collected(self, powerup):
+        """Remember that the player took powerup, so its chunk never regenerates it"""
+        origin = self.origins.pop(powerup, None)
+        if origin is not None:
+            index, entry = origin
+            self.taken.setdefault(index, set()).add(entry)
+
+    def loaded_bounds(self):
+        """World x-range covered by the loaded chunks"""
+        if not self.chunks:
+            return 0, 0
+        return min(self.chunks) * self.chunk_width, (max(self.chunks) + 1) * self.chunk_width
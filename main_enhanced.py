@@ -5,6 +5,7 @@ A platformer where you play as a mushroom trying to jump on Mario
 while fighting enemy mushrooms and avoiding obstacles!
 """
 
+import argparse
 import pygame
 import sys
 import os
@@ -13,23 +14,66 @@ import os
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
 from game_logic import Game
-from game_ui import draw_ui
+from game_ui import draw_screen, draw_ui, DirtyRectRenderer
+from game_loop import FixedTimestepLoop
+from game_input import InputRecorder, load_recording, replay_recording
+from profiler import FrameProfiler
+from frame_capture import CaptureRenderer, open_capture
+
+def parse_args():
+    """Parse command line options"""
+    parser = argparse.ArgumentParser(description="Super Mushroom: Enhanced Battle Edition")
+    parser.add_argument('--dirty-rects', action='store_true',
+                        help="only redraw and present changed screen regions")
+    parser.add_argument('--fps', type=int, default=60,
+                        help="maximum rendered frames per second (0 for no limit)")
+    parser.add_argument('--interpolate', action='store_true',
+                        help="draw moving objects between simulation steps")
+    parser.add_argument('--entity-backend', choices=('sprites', 'numpy'), default='sprites',
+                        help="how enemies and allies are simulated (numpy needs NumPy)")
+    parser.add_argument('--active-margin', type=float, default=1.0,
+                        help="screen widths beyond the camera in which enemies and items stay awake")
+    parser.add_argument('--seed', type=int,
+                        help="seed for gameplay randomness")
+    parser.add_argument('--record', metavar='PATH',
+                        help="record the session's input to PATH on exit")
+    parser.add_argument('--profile', metavar='PATH',
+                        help="time every frame and export the last frames to PATH (.csv or .json) on exit")
+    parser.add_argument('--replay', metavar='PATH',
+                        help="replay a recording headlessly and print the outcome")
+    parser.add_argument('--capture', metavar='PATH',
+                        help="save rendered frames as PNGs in directory PATH, or raw into a PATH ending in .raw")
+    parser.add_argument('--capture-every', type=int, default=1, metavar='N',
+                        help="capture only every Nth frame")
+    return parser.parse_args()
 
 def main():
     """Main function to run the enhanced mushroom game"""
+    args = parse_args()
+    if args.replay:
+        replay(args.replay, args.active_margin, args.capture, args.capture_every)
+        return
+    
     # Initialize pygame
     pygame.init()
+    game = None
+    capture = open_capture(args.capture) if args.capture else None
     
     try:
         # Create and run the game
-        game = Game()
+        game = Game(seed=args.seed, entity_backend=args.entity_backend,
+                    active_margin=args.active_margin)
+        if args.record:
+            game.recorder = InputRecorder()
+        if args.profile:
+            game.profiler = FrameProfiler(enabled=True)
+        draw = DirtyRectRenderer().draw if args.dirty_rects else draw_ui
+        if capture:
+            draw = CaptureRenderer(capture, draw, args.capture_every).draw
         
-        # Main game loop
-        while game.running:
-            game.handle_events()
-            game.update()
-            draw_ui(game)
-            game.clock.tick(60)
+        # Main game loop: fixed 60 Hz simulation, rendering as fast as allowed
+        loop = FixedTimestepLoop(game, draw, max_fps=args.fps, interpolate=args.interpolate)
+        loop.run()
             
     except KeyboardInterrupt:
         print("\nGame interrupted by user")
@@ -39,8 +83,42 @@ def main():
         traceback.print_exc()
     finally:
         # Clean up
+        if game is not None:
+            game.level_loader.shutdown()
+            if game.recorder:
+                game.recorder.save(args.record)
+                print(f"Input recorded to {args.record} (seed {game.seed})")
+            if args.profile:
+                game.profiler.export(args.profile)
+                print(f"Frame timings written to {args.profile}")
+        if capture:
+            capture.close()
+            print(f"{capture.count} frames captured to {args.capture}")
         pygame.quit()
         print("Game ended. Thanks for playing!")
 
+def replay(path, active_margin, capture_path=None, capture_every=1):
+    """Replay a recorded session as fast as possible and report the outcome.
+
+    The recording brings its own activation margin and entity backend;
+    active_margin only applies to old recordings made before they were
+    stored. With capture_path every step is also rendered offscreen and
+    captured.
+    """
+    game = Game(headless=True, active_margin=active_margin)
+    draw = capture = None
+    if capture_path:
+        game.create_fonts()
+        capture = open_capture(capture_path)
+        draw = CaptureRenderer(capture, draw_screen, capture_every).draw
+    try:
+        replay_recording(game, load_recording(path), draw)
+    finally:
+        if capture:
+            capture.close()
+            print(f"{capture.count} frames captured to {capture_path}")
+    print(f"Replay finished: {game.state.name}, level {game.current_level}, "
+          f"score {game.score}, lives {game.lives}, health {game.player_mushroom.health}")
+
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,151 @@
+"""Frame-time profiler with named timing scopes.
+
+Code to be measured is wrapped in `with profiler.scope('name'):`; the time
+spent in each scope is summed per frame, and the last `window` frames are
+kept so rolling percentiles can be shown on screen (see game_ui) or the
+samples exported to CSV or JSON for offline analysis. Scope names use dots
+for nesting, e.g. 'update' and 'update.collisions'.
+
+A disabled profiler hands out one shared do-nothing scope, so leaving the
+hooks in place costs a method call per scope and nothing else.
+"""
+
+import csv
+import json
+import time
+from collections import deque
+
+FRAME = 'frame'  # Whole-frame time, from begin_frame to end_frame
+PERCENTILES = (50, 95, 99)
+
+class _NullScope:
+    """Scope handed out while profiling is off"""
+    __slots__ = ()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL_SCOPE = _NullScope()
+
+class _Scope:
+    """Reusable timing scope adding its elapsed time to the current frame"""
+    __slots__ = ('profiler', 'name', 'start')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = self.profiler.clock()
+        return self
+
+    def __exit__(self, *exc):
+        current = self.profiler.current
+        current[self.name] = current.get(self.name, 0.0) + self.profiler.clock() - self.start
+        return False
+
+def percentile(ordered, p):
+    """Nearest-rank percentile of an already sorted, non-empty list"""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * p / 100))]
+
+class FrameProfiler:
+    """Collects per-frame scope timings over a rolling window.
+
+    enabled is whether timings are collected; overlay whether game_ui
+    draws them. Showing the overlay turns collection on, hiding it goes
+    back to collecting only if the profiler was created enabled.
+    """
+
+    def __init__(self, window=600, enabled=False, clock=time.perf_counter):
+        self.clock = clock
+        self.collect = enabled
+        self.enabled = enabled
+        self.overlay = False
+        self.frames = deque(maxlen=window)
+        self.names = {FRAME}  # Every scope name seen
+        self.current = {}
+        self.frame_start = None
+        self.frame_count = 0
+        self._scopes = {}
+
+    def toggle_overlay(self):
+        """Show or hide the on-screen overlay"""
+        self.overlay = not self.overlay
+        self.enabled = self.overlay or self.collect
+
+    def scope(self, name):
+        """Return a context manager timing its block under name"""
+        if not self.enabled:
+            return _NULL_SCOPE
+        scope = self._scopes.get(name)
+        if scope is None:
+            scope = self._scopes[name] = _Scope(self, name)
+        return scope
+
+    def begin_frame(self):
+        """Start timing a frame"""
+        self.current = {}
+        self.frame_start = self.clock() if self.enabled else None
+
+    def end_frame(self):
+        """Store the finished frame's timings in the window"""
+        if self.frame_start is None or not self.enabled:
+            return
+        current = self.current
+        current[FRAME] = self.clock() - self.frame_start
+        self.names.update(current)
+        self.frames.append(current)
+        self.frame_count += 1
+        self.frame_start = None
+
+    def scope_names(self):
+        """Scope names with the whole frame first and children after parents"""
+        return sorted(self.names, key=lambda name: (name != FRAME, name))
+
+    def samples(self, name):
+        """Milliseconds spent in name for every frame of the window"""
+        return [frame.get(name, 0.0) * 1000 for frame in self.frames]
+
+    def summary(self):
+        """Mean and percentiles in milliseconds per scope over the window"""
+        result = {}
+        for name in self.scope_names():
+            ordered = sorted(self.samples(name))
+            if not ordered:
+                continue
+            stats = {'mean': sum(ordered) / len(ordered)}
+            for p in PERCENTILES:
+                stats[f'p{p}'] = percentile(ordered, p)
+            result[name] = stats
+        return result
+
+    def export(self, path):
+        """Write the window to path as JSON or, for a .csv path, CSV"""
+        if str(path).lower().endswith('.csv'):
+            self.export_csv(path)
+        else:
+            self.export_json(path)
+
+    def export_csv(self, path):
+        """One row per frame, one millisecond column per scope"""
+        names = self.scope_names()
+        first = self.frame_count - len(self.frames)
+        with open(path, 'w', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerow(['frame'] + [f'{name}_ms' for name in names])
+            for i, frame in enumerate(self.frames):
+                writer.writerow([first + i] + [f'{frame.get(name, 0.0) * 1000:.4f}' for name in names])
+
+    def export_json(self, path):
+        """Summary plus the raw per-frame samples"""
+        data = {
+            'frames': len(self.frames),
+            'summary': self.summary(),
+            'samples': {name: self.samples(name) for name in self.scope_names()},
+        }
+        with open(path, 'w') as f:
+            json.dump(data, f, indent=2)